@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import threading
+
+# Replace path with text in one step: readers see the old file or the new
+# one, never a half-written file, even if the tool dies mid-write
+def write_text(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+# Same for a JSON document; options go to json.dumps
+def write_json(path, data, **options):
+    write_text(path, json.dumps(data, **options))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+# Benchmark reading address/monitor from large hyprctl clients -j payloads.
+# Run: python3 bench_clients.py
+
+import json
+import random
+import time
+import tracemalloc
+
+import hypr_clients
+
+SIZES = (1000, 10000)
+FIELDS = ("address", "monitor")
+REPEAT = 5
+
+# One client entry shaped like hyprctl clients -j output
+def fake_client(i):
+    return {
+        "address": f"0x{0x55d0_0000_0000 + i * 0x40:x}",
+        "mapped": True,
+        "hidden": False,
+        "at": [random.randint(0, 3840), random.randint(0, 2160)],
+        "size": [random.randint(200, 1920), random.randint(200, 1080)],
+        "workspace": {"id": i % 10 + 1, "name": str(i % 10 + 1)},
+        "floating": i % 7 == 0,
+        "pseudo": False,
+        "monitor": i % 3,
+        "class": random.choice(["firefox", "kitty", "code", "org.gnome.Nautilus"]),
+        "title": f"Window {i} - " + "x" * random.randint(10, 80),
+        "initialClass": "kitty",
+        "initialTitle": "kitty",
+        "pid": 10000 + i,
+        "xwayland": False,
+        "pinned": False,
+        "fullscreen": 0,
+        "fullscreenClient": 0,
+        "grouped": [],
+        "tags": [],
+        "swallowing": "0x0",
+        "focusHistoryID": i,
+        "inhibitingIdle": False,
+    }
+
+def payload(count):
+    random.seed(count)
+    return json.dumps([fake_client(i) for i in range(count)], indent=1)
+
+# Best wall time over REPEAT runs and peak traced memory of one run
+def measure(func):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+def full_parse(text):
+    return [(c["address"], c["monitor"]) for c in json.loads(text)]
+
+def main():
+    cases = [
+        ("json.loads full", lambda text: full_parse(text)),
+        ("selective, stdlib", lambda text: list(hypr_clients.decode_clients(text, 0, FIELDS)[0])),
+    ]
+
+    for count in SIZES:
+        text = payload(count)
+        print(f"\n{count} windows, {len(text) / 1024:.0f} KiB payload")
+        for name, func in cases:
+            seconds, peak = measure(lambda: func(text))
+            print(f"  {name:<22} {seconds * 1000:8.2f} ms  peak {peak / 1024:8.0f} KiB")
+
+if __name__ == "__main__":
+    main()
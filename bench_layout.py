@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+# Benchmark building row, stack and grid layouts and their batch commands.
+# Run: python3 bench_layout.py
+
+import random
+import time
+
+import hypr_layout
+import hypr_model
+
+SIZES = (4, 16, 64, 256)
+REPEAT = 50
+MODES = ["1920x1080@60.00Hz", "2560x1440@144.00Hz", "3840x2160@60.00Hz", "1280x720@60.00Hz"]
+
+# One output shaped like hyprctl monitors -j output, mostly headless panels
+def fake_monitor(i):
+    mode = hypr_model.parse_mode(random.choice(MODES))
+    return hypr_model.Monitor({
+        "id": i,
+        "name": f"HEADLESS-{i}" if i else "eDP-1",
+        "width": mode.width,
+        "height": mode.height,
+        "refreshRate": mode.refresh,
+        "scale": random.choice([1.0, 1.25, 1.5, 2.0]),
+        "transform": random.choice([0, 0, 0, 1]),
+        "availableModes": MODES,
+    })
+
+# Best wall time over REPEAT runs
+def measure(func):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    random.seed(0)
+    for count in SIZES:
+        monitors = [fake_monitor(i) for i in range(count)]
+        print(f"\n{count} outputs")
+        for kind in hypr_layout.LAYOUTS:
+            seconds = measure(lambda: hypr_layout.layout_commands(
+                monitors, hypr_layout.build_layout(kind, monitors, bezel=(40, 40))))
+            print(f"  {kind:<6} {seconds * 1e6:10.1f} us  ({seconds * 1e6 / count:.2f} us/output)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import sys
+import threading
+
+import atomic_file
+import hypr_config
+import hypr_ipc
+import transactions
+
+HISTORY_FILE = os.path.expanduser("~/.cache/hyprland_monitor_manager/history.json")
+MAX_STATES = 50
+
+# A configuration is {monitor name: keyword monitor value}. Only the
+# difference between neighbouring configurations is kept, as
+# {name: (old value, new value)} for the monitors that changed, and values
+# are interned, so unchanged monitors cost nothing and every step can be
+# walked in both directions without replaying the history.
+deltas = []
+position = 0        # Number of deltas applied to reach the current configuration
+current = None      # Current configuration
+_pending = None     # (position, configuration) an applied step moves to once kept
+_lock = threading.Lock()
+_loaded = False
+
+def _load():
+    global deltas, position, current, _loaded
+    _loaded = True
+    try:
+        with open(HISTORY_FILE) as f:
+            data = json.load(f)
+        deltas = [{name: tuple(_intern(v) for v in pair) for name, pair in delta.items()}
+                  for delta in data["deltas"]]
+        position = min(int(data["position"]), len(deltas))
+        current = {name: _intern(rule) for name, rule in data["current"].items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        deltas, position, current = [], 0, None
+
+def _save():
+    atomic_file.write_json(HISTORY_FILE, {"deltas": deltas, "position": position, "current": current})
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else None
+
+# Configuration of a snapshot's monitors
+def configuration(monitors):
+    return {rule.split(",", 1)[0]: _intern(rule) for rule in transactions.monitor_rules(monitors)}
+
+def _diff(old, new):
+    return {name: (old.get(name), new.get(name))
+            for name in old.keys() | new.keys() if old.get(name) != new.get(name)}
+
+# Note the live configuration. A change drops anything that could have been
+# redone, like any editor's undo stack; nothing is noted while an undo or
+# redo waits for confirm(). Returns True if a step was added
+def record(monitors):
+    global current, position
+    with _lock:
+        if not _loaded:
+            _load()
+        if _pending is not None:
+            return False
+        new = configuration(monitors)
+        if current is None:
+            current = new
+            _save()
+            return False
+        delta = _diff(current, new)
+        if not delta:
+            return False
+        del deltas[position:]
+        deltas.append(delta)
+        if len(deltas) > MAX_STATES:
+            del deltas[0]
+        position = len(deltas)
+        current = new
+        _save()
+        return True
+
+# Keyword commands for the changed monitors only: mirror sources first,
+# disabled outputs last, monitors that no longer exist skipped
+def _commands(delta, index):
+    def order(rule):
+        return 2 if rule.endswith(",disable") else 1 if ",mirror," in rule else 0
+    rules = [pair[index] for pair in delta.values() if pair[index] is not None]
+    return [f"keyword monitor {rule}" for rule in sorted(rules, key=order)]
+
+# The step an undo (or redo) would take from the live monitors, or None
+# when there is nothing to step to. Raises ValueError if the configuration
+# it leads to would make outputs overlap
+def plan(undo, monitors):
+    with _lock:
+        if not _loaded:
+            _load()
+        if undo and position == 0 or not undo and position == len(deltas):
+            return None
+        delta = deltas[position - 1] if undo else deltas[position]
+        target = position - 1 if undo else position + 1
+    index = 0 if undo else 1
+    rules = [pair[index] for pair in delta.values() if pair[index] is not None]
+    hypr_config.check_rules([hypr_config.parse_monitor_rule(rule) for rule in rules], monitors)
+    return {"undo": undo, "delta": delta, "position": target}
+
+# Send a planned step in one batch. It becomes the current configuration
+# only once confirm() is called, so a step that is reverted leaves the
+# history where it was. Returns (ok, status message)
+def apply(step):
+    global _pending
+    undo, delta = step["undo"], step["delta"]
+    index = 0 if undo else 1
+    commands = _commands(delta, index)
+    replies = hypr_ipc.batch(commands)
+    failures = sum(1 for reply in replies if reply != "ok")
+    if failures:
+        return False, (f"{'Undo' if undo else 'Redo'} of changes to {', '.join(sorted(delta))} failed: "
+                       f"{failures} of {len(commands)} commands")
+    with _lock:
+        new = dict(current)
+        for name, pair in delta.items():
+            if pair[index] is None:
+                new.pop(name, None)
+            else:
+                new[name] = pair[index]
+        _pending = (step["position"], new)
+    return True, f"{'Undid' if undo else 'Redid'} changes to {', '.join(sorted(delta))} with {len(commands)} commands"
+
+# The applied step was kept: move the history to it
+def confirm():
+    global _pending, position, current
+    with _lock:
+        if _pending is None:
+            return
+        (position, current), _pending = _pending, None
+        _save()
+
+# The applied step was reverted: the history stays where it was
+def discard():
+    global _pending
+    with _lock:
+        _pending = None
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import threading
+
+import atomic_file
+import hypr_events
+import hypr_ipc
+import hypr_layout
+import hypr_model
+
+STATE_FILE = os.path.expanduser("~/.config/hyprland_monitor_manager/headless_outputs.json")
+DEFAULT_MODE = "1920x1080@60Hz"
+
+# Virtual outputs the tool manages: [{"name", "mode", "scale"}]
+outputs = None
+_lock = threading.Lock()
+
+def _load():
+    try:
+        with open(STATE_FILE) as f:
+            return [spec for spec in json.load(f).get("outputs", []) if spec.get("name")]
+    except (OSError, json.JSONDecodeError, AttributeError):
+        return []
+
+def _save():
+    atomic_file.write_json(STATE_FILE, {"outputs": outputs}, indent=1)
+
+def _ensure_loaded():
+    global outputs
+    if outputs is None:
+        outputs = _load()
+        hypr_model.headless_names.update(spec["name"] for spec in outputs)
+
+# Monitor object for an output that may not exist yet, so layout and rules
+# work the same as for real ones
+def _virtual_monitor(spec):
+    mode = hypr_model.parse_mode(spec["mode"])
+    return hypr_model.Monitor({
+        "name": spec["name"],
+        "width": mode.width,
+        "height": mode.height,
+        "refreshRate": mode.refresh,
+        "scale": spec.get("scale", 1.0),
+        "availableModes": [str(mode)],
+    })
+
+# Unused HEADLESS-n names
+def _free_names(taken, count):
+    names = []
+    n = 1
+    while len(names) < count:
+        name = f"{hypr_model.HEADLESS_PREFIX}{n}"
+        if name not in taken:
+            names.append(name)
+        n += 1
+    return names
+
+# Create whatever is missing and place all specs in a row to the right of the
+# other outputs, in one batch. Returns [(name, reply)] failures
+def _apply(snapshot, specs):
+    names = {spec["name"] for spec in specs}
+    present = {m.name for m in snapshot.monitors}
+    others = [m for m in snapshot.monitors if not m.disabled and m.name not in names]
+    virtual = [_virtual_monitor(spec) for spec in specs]
+
+    positions = hypr_layout.beside(others, {m.name: (m.x, m.y) for m in others}, virtual)
+    hypr_layout.check_layout(others + virtual, positions)
+
+    creates = [f"output create headless {spec['name']}" for spec in specs if spec["name"] not in present]
+    commands = creates + hypr_layout.layout_commands(virtual, positions)
+    replies = hypr_ipc.batch(commands)
+    labels = [command.rsplit(" ", 1)[1] for command in creates] + [m.name for m in virtual]
+    return [(name, reply) for name, reply in zip(labels, replies) if reply != "ok"]
+
+# Create count virtual outputs with one mode and scale in a single batch.
+# Returns the names created
+def create(count, mode=DEFAULT_MODE, scale=1.0, snapshot=None):
+    snapshot = snapshot or hypr_model.take_snapshot()
+    mode = str(hypr_model.parse_mode(mode))
+    with _lock:
+        _ensure_loaded()
+        taken = {m.name for m in snapshot.monitors} | {spec["name"] for spec in outputs}
+        specs = [{"name": name, "mode": mode, "scale": scale} for name in _free_names(taken, count)]
+        created, failed = _add(snapshot, specs)
+    print(f"Created {len(created)} headless outputs at {mode}"
+          + (f", {len(failed)} failed: {sorted(failed)}" if failed else ""))
+    return [spec["name"] for spec in created]
+
+# Create specs and manage the ones that came up; the caller holds _lock.
+# Returns (created specs, failed names)
+def _add(snapshot, specs):
+    hypr_model.headless_names.update(spec["name"] for spec in specs)
+    failed = {name for name, _ in _apply(snapshot, specs)}
+    created = [spec for spec in specs if spec["name"] not in failed]
+    outputs.extend(created)
+    _save()
+    return created, failed
+
+# Bring back outputs destroy() removed, under the same names, e.g. when the
+# removal is reverted. Returns the names created
+def restore(specs, snapshot=None):
+    snapshot = snapshot or hypr_model.take_snapshot()
+    with _lock:
+        _ensure_loaded()
+        managed = {spec["name"] for spec in outputs}
+        created, failed = _add(snapshot, [spec for spec in specs if spec["name"] not in managed])
+    print(f"Restored {len(created)} headless outputs"
+          + (f", {len(failed)} failed: {sorted(failed)}" if failed else ""))
+    return [spec["name"] for spec in created]
+
+# Remove managed virtual outputs (all of them by default) in one batch.
+# Returns the specs removed
+def destroy(names=None):
+    with _lock:
+        _ensure_loaded()
+        managed = [spec["name"] for spec in outputs]
+        names = managed if names is None else [name for name in names if name in managed]
+        if not names:
+            return []
+        replies = hypr_ipc.batch(f"output remove {name}" for name in names)
+        removed = {name for name, reply in zip(names, replies) if reply == "ok"}
+        specs = [spec for spec in outputs if spec["name"] in removed]
+        outputs[:] = [spec for spec in outputs if spec["name"] not in removed]
+        hypr_model.headless_names.difference_update(removed)
+        _save()
+    print(f"Removed {len(removed)} headless outputs")
+    return specs
+
+# Bring the saved set back after a reload or restart: create the missing
+# outputs and reapply every rule in one batch
+def recreate(snapshot=None):
+    with _lock:
+        _ensure_loaded()
+        if not outputs:
+            return 0
+        snapshot = snapshot or hypr_model.take_snapshot()
+        failures = _apply(snapshot, outputs)
+    for name, reply in failures:
+        print(f"Failed to restore headless output {name}: {reply}")
+    print(f"Restored {len(outputs)} headless outputs")
+    return len(outputs)
+
+def _on_reload(event, data):
+    try:
+        recreate()
+    except (OSError, ValueError) as e:
+        print(f"Headless output restore failed: {str(e)}")
+
+# Recreate saved outputs now and after every config reload, which drops
+# their runtime rules
+def start():
+    _on_reload("start", "")
+    hypr_events.subscribe("configreloaded", _on_reload)
+    hypr_events.start_listener()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+
+import json
+
+# Client fields the tool actually reads
+CLIENT_FIELDS = ("address", "monitor", "workspace", "floating", "at", "size", "fullscreen", "class", "title")
+WHITESPACE = " \t\r\n"
+
+_decoder = json.JSONDecoder()
+
+# Keep only the requested fields of one client
+def _select(client, fields):
+    return {field: client.get(field) for field in fields}
+
+# Skip whitespace and commas between array elements
+def _skip(text, pos):
+    while pos < len(text) and (text[pos] in WHITESPACE or text[pos] == ","):
+        pos += 1
+    return pos
+
+# Decode a client array starting at text[pos], one element at a time, so the
+# full list of complete client objects never exists. Returns (clients, end)
+def decode_clients(text, pos=0, fields=CLIENT_FIELDS):
+    pos = _skip(text, pos)
+    if text[pos:pos + 1] != "[":
+        raise ValueError(f"Expected a client list at offset {pos}")
+    clients = []
+    pos = _skip(text, pos + 1)
+    while text[pos:pos + 1] != "]":
+        client, pos = _decoder.raw_decode(text, pos)
+        clients.append(_select(client, fields))
+        pos = _skip(text, pos)
+    return clients, pos + 1
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+import glob
+import os
+import threading
+
+import hypr_layout
+import hypr_model
+
+HYPR_CONFIG = os.path.expanduser("~/.config/hypr/hyprland.conf")
+RULE_KEYS = ("monitor", "workspace")
+
+# path -> ((mtime_ns, size), [(key, value)]) for every file read so far
+_file_cache = {}
+# Result of the last walk, the stats of the files it read and what each
+# source= pattern matched
+_tree_cache = None
+_lock = threading.Lock()
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+# Top-level key = value lines of one file, comments and categories skipped.
+# Cached by mtime and size, so an unchanged file is never read twice
+def _entries(path, stat):
+    cached = _file_cache.get(path)
+    if cached and cached[0] == stat:
+        return cached[1]
+    entries = []
+    depth = 0
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                # "##" is an escaped "#" in Hyprland's syntax
+                line = line.replace("##", "\0").split("#", 1)[0].replace("\0", "#").strip()
+                if not line:
+                    continue
+                if line.endswith("{"):
+                    depth += 1
+                    continue
+                if line == "}":
+                    depth = max(depth - 1, 0)
+                    continue
+                key, sep, value = line.partition("=")
+                if sep and depth == 0:
+                    entries.append((key.strip(), value.strip()))
+    except OSError:
+        entries = []
+    _file_cache[path] = (stat, entries)
+    return entries
+
+def _expand(value, variables):
+    # Longest names first so $mainMod is not replaced as $main
+    for name in sorted(variables, key=len, reverse=True):
+        value = value.replace(name, variables[name])
+    return value
+
+# Walk hyprland.conf and its source= includes in order. Returns
+# {"files": [paths read], "sources": [paths included, existing or not],
+# "rules": [(key, value, path)]} with $variables expanded
+def _walk(root):
+    files, sources, rules, variables = [], [], [], {}
+    stats, matches = {}, {}
+
+    def visit(path):
+        if path in stats:
+            return  # Already read; also stops include cycles
+        stat = _stat(path)
+        stats[path] = stat
+        if stat is None:
+            return
+        files.append(path)
+        base = os.path.dirname(path)
+        for key, value in _entries(path, stat):
+            if key.startswith("$"):
+                variables[key] = _expand(value, variables)
+            elif key == "source":
+                pattern = os.path.join(base, os.path.expanduser(_expand(value, variables)))
+                matches[pattern] = _glob(pattern)
+                for include in matches[pattern] or [pattern]:
+                    sources.append(os.path.normpath(include))
+                    visit(sources[-1])
+            elif key in RULE_KEYS:
+                rules.append((key, _expand(value, variables), path))
+
+    visit(root)
+    return {"files": files, "sources": sources, "rules": rules}, stats, matches
+
+def _glob(pattern):
+    return sorted(glob.glob(pattern))
+
+# Parsed config tree; an unchanged tree costs one stat per file and one
+# directory listing per source= pattern, so a file that starts matching a
+# glob, or appears where a missing include pointed, is picked up
+def read_config(root=HYPR_CONFIG):
+    global _tree_cache
+    with _lock:
+        if _tree_cache and _tree_cache[0] == root \
+                and all(_stat(path) == stat for path, stat in _tree_cache[2].items()) \
+                and all(_glob(pattern) == found for pattern, found in _tree_cache[3].items()):
+            return _tree_cache[1]
+        result, stats, matches = _walk(root)
+        _tree_cache = (root, result, stats, matches)
+        return result
+
+# Every file the config tree reads
+def config_files(root=HYPR_CONFIG):
+    return list(read_config(root)["files"])
+
+# Split "DP-1,2560x1440@144,0x0,1,transform,1" into its fields
+def parse_monitor_rule(value):
+    parts = [part.strip() for part in value.split(",")]
+    rule = {"name": parts[0], "value": value, "disabled": len(parts) > 1 and parts[1] == "disable"}
+    if not rule["disabled"]:
+        rule["mode"] = parts[1] if len(parts) > 1 else "preferred"
+        rule["position"] = parts[2] if len(parts) > 2 else "auto"
+        rule["scale"] = parts[3] if len(parts) > 3 else "1"
+        # Extra options come as name, value pairs
+        extras = dict(zip(parts[4::2], parts[5::2]))
+        rule["transform"] = int(extras["transform"]) if extras.get("transform", "").isdigit() else 0
+        rule["mirror"] = extras.get("mirror")
+    return rule
+
+# Layouts the user already wrote, one per file with monitor rules, as
+# {label: {"monitors": [rule dicts], "workspaces": [values], "path"}}.
+# Files in skip (e.g. the tool's own monitors.conf) are left out
+def profiles(root=HYPR_CONFIG, skip=()):
+    found = {}
+    for key, value, path in read_config(root)["rules"]:
+        if path in skip:
+            continue
+        label = os.path.relpath(path, os.path.dirname(root))
+        profile = found.setdefault(label, {"monitors": [], "workspaces": [], "path": path})
+        if key == "monitor":
+            profile["monitors"].append(parse_monitor_rule(value))
+        else:
+            profile["workspaces"].append(value)
+    return {label: profile for label, profile in found.items() if profile["monitors"]}
+
+# The layout after applying rules: outputs with an explicit mode and
+# position as planned, outputs without a rule where they are now. Outputs
+# the rules disable, mirror or leave to "auto" placement are not checked
+def _planned(rules, monitors):
+    by_rule = {rule["name"]: rule for rule in rules}
+    planned, positions = [], {}
+    for mon in monitors:
+        rule = by_rule.get(mon.name)
+        if rule is None:
+            if not (mon.disabled or mon.mirror_of):
+                planned.append(mon)
+                positions[mon.name] = (mon.x, mon.y)
+            continue
+        if rule["disabled"] or rule["mirror"] or "x" not in rule["position"]:
+            continue
+        try:
+            mode = mon.mode if "x" not in rule["mode"] else hypr_model.parse_mode(rule["mode"])
+            x, y = (int(v) for v in rule["position"].split("x"))
+            scale = mon.scale if rule["scale"] == "auto" else float(rule["scale"])
+        except ValueError:
+            continue
+        planned.append(hypr_model.Monitor({"name": mon.name, "width": mode.width, "height": mode.height,
+                                           "refreshRate": mode.refresh, "scale": scale,
+                                           "transform": rule["transform"],
+                                           "availableModes": [str(mode)]}))
+        positions[mon.name] = (x, y)
+    return planned, positions
+
+# Raise ValueError if applying rule dicts to these monitors would make
+# outputs overlap
+def check_rules(rules, monitors):
+    hypr_layout.check_layout(*_planned(rules, monitors))
+
+# Keyword commands that apply a profile to the connected monitors: rules for
+# outputs that are not connected are skipped, catch-all and desc: rules kept.
+# Raises ValueError if the explicitly placed outputs would overlap
+def profile_commands(profile, monitors):
+    names = {mon.name for mon in monitors}
+    rules = [rule for rule in profile["monitors"]
+             if rule["name"] in names or rule["name"] == "" or rule["name"].startswith("desc:")]
+    check_rules(rules, monitors)
+    commands = [f"keyword monitor {rule['value']}" for rule in rules]
+    commands += [f"keyword workspace {value}" for value in profile["workspaces"]]
+    # Workspace rules only affect new workspaces; move existing ones too
+    for value in profile["workspaces"]:
+        workspace, *options = [part.strip() for part in value.split(",")]
+        target = next((opt[len("monitor:"):] for opt in options if opt.startswith("monitor:")), None)
+        if target in names and (workspace.lstrip("-").isdigit() or workspace.startswith("name:")):
+            commands.append(f"dispatch moveworkspacetomonitor {workspace} {target}")
+    return commands
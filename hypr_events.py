@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import socket
+import threading
+import time
+
+import hypr_ipc
+
+# Callbacks per event name, e.g. {"fullscreen": [callback]}. "*" receives every
+# event, and the local "connected" event fires each time the socket connects
+_subscribers = {}
+_subscribers_lock = threading.Lock()
+_listener_thread = None
+
+# Path of Hyprland's event socket (socket2) for the running instance
+def socket2_path():
+    return hypr_ipc.socket_path(".socket2.sock")
+
+# Register a callback(event, data) for one event name or "*"
+def subscribe(event, callback):
+    with _subscribers_lock:
+        _subscribers.setdefault(event, []).append(callback)
+
+def unsubscribe(event, callback):
+    with _subscribers_lock:
+        callbacks = _subscribers.get(event, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+# Hand one "event>>data" line to its subscribers
+def dispatch_line(line):
+    event, sep, data = line.partition(">>")
+    if not sep:
+        return
+    with _subscribers_lock:
+        callbacks = list(_subscribers.get(event, ())) + list(_subscribers.get("*", ()))
+    for callback in callbacks:
+        try:
+            callback(event, data)
+        except Exception as e:
+            print(f"Event handler for {event} failed: {str(e)}")
+
+# Read socket2 forever, reconnecting if Hyprland restarts the socket
+def _listen():
+    while True:
+        path = socket2_path()
+        if not path:
+            time.sleep(5)
+            continue
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(path)
+                # Lets subscribers resync state that may have changed while disconnected
+                dispatch_line("connected>>")
+                buffer = b""
+                while True:
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        break
+                    buffer += chunk
+                    *lines, buffer = buffer.split(b"\n")
+                    for line in lines:
+                        dispatch_line(line.decode("utf-8", "replace"))
+        except OSError as e:
+            print(f"Hyprland event socket error: {str(e)}")
+        time.sleep(1)
+
+# Start the shared listener thread once
+def start_listener():
+    global _listener_thread
+    if _listener_thread and _listener_thread.is_alive():
+        return
+    if not socket2_path():
+        print("Hyprland event socket not found, live updates disabled")
+    _listener_thread = threading.Thread(target=_listen, daemon=True)
+    _listener_thread.start()
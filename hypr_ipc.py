@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+import codecs
+import json
+import os
+import socket
+import subprocess
+
+# Directory holding the running Hyprland instance's sockets
+def instance_dir():
+    signature = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE", "")
+    if not signature:
+        return None
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+    for base in (os.path.join(runtime_dir, "hypr"), "/tmp/hypr"):
+        path = os.path.join(base, signature)
+        if os.path.isdir(path):
+            return path
+    return None
+
+# Path of one of Hyprland's sockets, or None when not running under Hyprland
+def socket_path(name=".socket.sock"):
+    directory = instance_dir()
+    path = os.path.join(directory, name) if directory else None
+    return path if path and os.path.exists(path) else None
+
+# The connection failed after the request went out, so Hyprland may already
+# have run it; sending it again through hyprctl could run it twice
+class RequestSentError(OSError):
+    pass
+
+# Send one request over the command socket and yield the reply as text chunks.
+# Failures once connected raise RequestSentError
+def stream_request(command, timeout=5.0):
+    path = socket_path()
+    if not path:
+        raise OSError("Hyprland command socket not found")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        try:
+            sock.sendall(command.encode())
+            decoder = codecs.getincrementaldecoder("utf-8")("replace")
+            while True:
+                chunk = sock.recv(1 << 16)
+                if not chunk:
+                    break
+                yield decoder.decode(chunk)
+            yield decoder.decode(b"", final=True)
+        except OSError as e:
+            raise RequestSentError(str(e) or type(e).__name__) from e
+
+# Send one request over the command socket and return the raw reply
+def request(command, timeout=5.0):
+    return "".join(stream_request(command, timeout))
+
+# Split concatenated JSON documents, as returned by a batch request.
+# parsers may give a parse(text, pos) -> (value, end) for any position
+def split_json(text, count, parsers=None):
+    decoder = json.JSONDecoder()
+    values, pos = [], 0
+    while len(values) < count:
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        parse = parsers.get(len(values)) if parsers else None
+        value, pos = parse(text, pos) if parse else decoder.raw_decode(text, pos)
+        values.append(value)
+    return values
+
+# Run several JSON queries in one batched round trip, e.g.
+# batch_json(["monitors all", "clients"]) -> [monitors, clients]
+def batch_json(queries, parsers=None):
+    commands = ";".join(f"j/{query}" for query in queries)
+    try:
+        reply = request(f"[[BATCH]]{commands}")
+    except OSError:
+        # No direct socket access - let hyprctl do the same batch
+        result = subprocess.run(["hyprctl", "--batch", commands], capture_output=True, text=True)
+        if result.returncode != 0:
+            raise OSError(result.stderr.strip() or "hyprctl --batch failed")
+        reply = result.stdout
+    try:
+        return split_json(reply, len(queries), parsers)
+    except ValueError:
+        raise ValueError(f"Unexpected batch reply: {reply[:200]}")
+
+# Run dispatch/keyword commands in one batched round trip and return one
+# reply per command ("ok" on success). timeout limits each wait on Hyprland.
+# hyprctl is only used when the socket cannot be reached: commands that may
+# have been delivered are never sent twice
+def batch(commands, timeout=5.0):
+    commands = list(commands)
+    if not commands:
+        return []
+    joined = ";".join(commands)
+    try:
+        reply = request(f"[[BATCH]]{joined}", timeout)
+    except RequestSentError as e:
+        reply = f"no reply from Hyprland within {timeout:g}s: {str(e)}"
+    except OSError:
+        try:
+            result = subprocess.run(["hyprctl", "--batch", joined], capture_output=True, text=True, timeout=timeout)
+            reply = result.stdout if result.returncode == 0 else (result.stderr or "hyprctl --batch failed")
+        except subprocess.TimeoutExpired:
+            reply = f"hyprctl --batch timed out after {timeout:g}s"
+    # Depending on the Hyprland version replies are joined directly or by blank lines
+    if "".join(reply.split()) == "ok" * len(commands):
+        return ["ok"] * len(commands)
+    replies = [part.strip() for part in reply.strip().split("\n\n")]
+    if len(replies) != len(commands):
+        replies = [reply.strip()] * len(commands)
+    return replies
+
+# Workspace argument for dispatchers: the id for numbered workspaces, else name:
+def workspace_selector(name):
+    return name if name.lstrip("-").isdigit() else f"name:{name}"
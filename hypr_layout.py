@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+import bisect
+import heapq
+
+import hypr_ipc
+
+LAYOUTS = ("Row", "Stack", "Grid")
+
+# Layouts are {monitor name: (x, y)} in logical (scaled, rotated) pixels.
+# Every builder is a single pass over the monitors, so hundreds of outputs
+# cost no more than a handful.
+
+# Side by side along y=0, in the given order
+def row_layout(monitors, gap=0):
+    positions = {}
+    x = 0
+    for mon in monitors:
+        positions[mon.name] = (x, 0)
+        x += mon.logical_size[0] + gap
+    return positions
+
+# Top to bottom along x=0, in the given order
+def stack_layout(monitors, gap=0):
+    positions = {}
+    y = 0
+    for mon in monitors:
+        positions[mon.name] = (0, y)
+        y += mon.logical_size[1] + gap
+    return positions
+
+# Rows of `columns` outputs, filled left to right. Each column is as wide as
+# its widest output and each row as tall as its tallest, so mixed sizes never
+# overlap. bezel=(x, y) leaves that many logical pixels between neighbours,
+# so content lines up across the frames of a video wall
+def grid_layout(monitors, columns, bezel=(0, 0)):
+    columns = max(1, min(columns, len(monitors) or 1))
+    widths = [0] * columns
+    heights = [0] * ((len(monitors) + columns - 1) // columns)
+    for i, mon in enumerate(monitors):
+        width, height = mon.logical_size
+        row, col = divmod(i, columns)
+        widths[col] = max(widths[col], width)
+        heights[row] = max(heights[row], height)
+
+    col_x = [0] * columns
+    for col in range(1, columns):
+        col_x[col] = col_x[col - 1] + widths[col - 1] + bezel[0]
+    row_y = [0] * len(heights)
+    for row in range(1, len(heights)):
+        row_y[row] = row_y[row - 1] + heights[row - 1] + bezel[1]
+
+    positions = {}
+    for i, mon in enumerate(monitors):
+        row, col = divmod(i, columns)
+        positions[mon.name] = (col_x[col], row_y[row])
+    return positions
+
+# Closest to a square wall for n outputs
+def square_columns(count):
+    columns = 1
+    while columns * columns < count:
+        columns += 1
+    return columns
+
+# Shift a layout so the named monitor sits at 0x0
+def anchor(positions, name):
+    if name not in positions:
+        return positions
+    dx, dy = positions[name]
+    if not (dx or dy):
+        return positions
+    return {mon: (x - dx, y - dy) for mon, (x, y) in positions.items()}
+
+# Build a layout by name: "Row", "Stack" or "Grid"
+def build_layout(kind, monitors, columns=None, bezel=(0, 0)):
+    if kind == "Row":
+        return row_layout(monitors, bezel[0])
+    if kind == "Stack":
+        return stack_layout(monitors, bezel[1])
+    if kind == "Grid":
+        return grid_layout(monitors, columns or square_columns(len(monitors)), bezel)
+    raise ValueError(f"Unknown layout {kind}")
+
+# A layout with extra monitors added in a row to its right, top-aligned, so
+# they stay clear of it (e.g. headless outputs next to the physical ones)
+def beside(monitors, positions, extra):
+    rects = rectangles(monitors, positions)
+    right = max((rect[2] for rect in rects), default=0)
+    top = min((rect[1] for rect in rects), default=0)
+    placed = dict(positions)
+    placed.update({name: (x + right, y + top) for name, (x, y) in row_layout(extra).items()})
+    return placed
+
+# (x0, y0, x1, y1, name) for every placed output that is not a mirror
+def rectangles(monitors, positions):
+    rects = []
+    for mon in monitors:
+        if mon.name not in positions or mon.mirror_of:
+            continue
+        x, y = positions[mon.name]
+        width, height = mon.logical_size
+        rects.append((x, y, x + width, y + height, mon.name))
+    return rects
+
+# Sweep left to right keeping the y-intervals of outputs under the sweep line
+# sorted. Valid intervals never overlap, so a new output only has to be
+# compared with its neighbours: O(n log n). Returns [(name, name)] pairs
+def find_overlaps(rects):
+    overlaps = []
+    active = []   # sorted (y0, y1, name) of outputs crossing the sweep line
+    ending = []   # heap of (x1, y0, y1, name) to drop once the line passes x1
+    for x0, y0, x1, y1, name in sorted(rects):
+        while ending and ending[0][0] <= x0:
+            _, a0, a1, other = heapq.heappop(ending)
+            active.pop(bisect.bisect_left(active, (a0, a1, other)))
+        i = bisect.bisect_left(active, (y0, y1, name))
+        hits = [other for a0, a1, other in active[max(i - 1, 0):i + 1] if a0 < y1 and y0 < a1]
+        # Anything further along also starts inside this output
+        j = i + 1
+        while j < len(active) and active[j][0] < y1:
+            hits.append(active[j][2])
+            j += 1
+        if hits:
+            overlaps.extend((other, name) for other in dict.fromkeys(hits))
+            continue  # Keep the active intervals disjoint
+        active.insert(i, (y0, y1, name))
+        heapq.heappush(ending, (x1, y0, y1, name))
+    return overlaps
+
+# Edges where one output's side meets another's: outputs are grouped by the
+# coordinate of that side, then intervals along it are merged in sorted order
+def _shared_edges(rects, axis):
+    low, high = {}, {}
+    for rect in rects:
+        start, end = (rect[0], rect[2]) if axis == 0 else (rect[1], rect[3])
+        span = (rect[1], rect[3]) if axis == 0 else (rect[0], rect[2])
+        high.setdefault(end, []).append((*span, rect[4]))
+        low.setdefault(start, []).append((*span, rect[4]))
+    for coord, before in high.items():
+        after = sorted(low.get(coord, ()))
+        if not after:
+            continue
+        before.sort()
+        j = 0
+        for b0, b1, left in before:
+            while j < len(after) and after[j][1] <= b0:
+                j += 1
+            k = j
+            while k < len(after) and after[k][0] < b1:
+                yield left, after[k][2]
+                k += 1
+
+# Outputs that cannot be reached from the anchor by moving the cursor across
+# shared edges
+def find_unreachable(rects, anchor_name=None):
+    parent = {rect[4]: rect[4] for rect in rects}
+
+    def find(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for axis in (0, 1):
+        for a, b in _shared_edges(rects, axis):
+            parent[find(a)] = find(b)
+    if not parent:
+        return []
+    root = find(anchor_name if anchor_name in parent else rects[0][4])
+    return [name for name in parent if find(name) != root]
+
+# Problems that would make Hyprland move outputs on its own, as messages.
+# An empty list means the layout can be sent as planned
+def validate_layout(monitors, positions, anchor_name=None):
+    rects = rectangles(monitors, positions)
+    problems = [f"{a} overlaps {b}" for a, b in find_overlaps(rects)]
+    unreachable = find_unreachable(rects, anchor_name)
+    if unreachable:
+        problems.append(f"Not touching the rest of the layout: {', '.join(sorted(unreachable))}")
+    return problems
+
+# keyword commands placing every monitor of a layout
+def layout_commands(monitors, positions):
+    return [f"keyword monitor {mon.rule(*positions[mon.name])}"
+            for mon in monitors if mon.name in positions]
+
+# Monitors whose position in the layout differs from where they are now
+def moved_monitors(monitors, positions):
+    return [mon for mon in monitors if mon.name in positions and positions[mon.name] != (mon.x, mon.y)]
+
+# Raise ValueError if outputs of a layout overlap, since Hyprland would move
+# those outputs itself. Gaps pass: a bezel-compensated wall has them on purpose
+def check_layout(monitors, positions):
+    overlaps = find_overlaps(rectangles([mon for mon in monitors if mon.name in positions], positions))
+    if overlaps:
+        raise ValueError("Invalid layout: " + "; ".join(f"{a} overlaps {b}" for a, b in overlaps))
+
+# Validate a whole layout with check_layout and send it as one batch; gaps
+# only warn. With changed_only, only the monitors that moved are sent.
+# Returns [(monitor name, reply)] failures
+def apply_layout(monitors, positions, anchor_name=None, changed_only=False):
+    placed = [mon for mon in monitors if mon.name in positions]
+    check_layout(placed, positions)
+    rects = rectangles(placed, positions)
+    unreachable = find_unreachable(rects, anchor_name)
+    if unreachable:
+        print(f"Layout warning: not touching the rest of the layout: {', '.join(sorted(unreachable))}")
+    if changed_only:
+        placed = moved_monitors(placed, positions)
+    replies = hypr_ipc.batch(layout_commands(placed, positions))
+    return [(mon.name, reply) for mon, reply in zip(placed, replies) if reply != "ok"]
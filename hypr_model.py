@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+import json
+import time
+
+import hypr_clients
+import hypr_ipc
+
+# Hyprland transforms 1, 3, 5 and 7 rotate the output by 90 or 270 degrees
+ROTATED_TRANSFORMS = (1, 3, 5, 7)
+FALLBACK_MODE = "1920x1080@60Hz"
+# "monitors all" also lists disabled outputs, which plain "monitors" leaves out
+SNAPSHOT_QUERIES = ("monitors all", "workspaces", "clients", "activeworkspace")
+# Default connector prefix of outputs made with hyprctl output create headless
+HEADLESS_PREFIX = "HEADLESS-"
+
+# Names of virtual outputs created under custom names (kept by headless_outputs)
+headless_names = set()
+
+# Parsed modes, mode lists and mode indexes shared between monitors and snapshots
+_mode_cache = {}
+_mode_list_cache = {}
+_mode_index_cache = {}
+
+# One display mode: integer width, height and refresh rate in millihertz
+class Mode:
+    __slots__ = ("width", "height", "refresh_mhz")
+
+    def __init__(self, width, height, refresh_mhz):
+        self.width = width
+        self.height = height
+        self.refresh_mhz = refresh_mhz
+
+    def key(self):
+        return (self.width, self.height, self.refresh_mhz)
+
+    def __eq__(self, other):
+        return isinstance(other, Mode) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __lt__(self, other):
+        return self.key() < other.key()
+
+    def __repr__(self):
+        return f"Mode({self.width}, {self.height}, {self.refresh_mhz})"
+
+    @property
+    def refresh(self):
+        return self.refresh_mhz / 1000
+
+    @property
+    def pixels(self):
+        return self.width * self.height
+
+    # Mode as hyprctl expects it, e.g. "1920x1080@59.95"
+    def spec(self):
+        return f"{self.width}x{self.height}@{self.refresh:.2f}"
+
+    # Mode as shown to the user, e.g. "1920x1080@59.95Hz"
+    def __str__(self):
+        return f"{self.spec()}Hz"
+
+# Shared Mode for (width, height, millihertz)
+def make_mode(width, height, refresh_mhz):
+    key = (int(width), int(height), int(refresh_mhz))
+    mode = _mode_cache.get(key)
+    if mode is None:
+        mode = _mode_cache[key] = Mode(*key)
+    return mode
+
+# Parse "1920x1080@59.95Hz" (the Hz suffix and rate are optional)
+def parse_mode(text):
+    mode = _mode_cache.get(text)
+    if mode is not None:
+        return mode
+    stripped = text.strip()
+    if stripped.endswith("Hz"):
+        stripped = stripped[:-2]
+    size, _, rate = stripped.partition("@")
+    width, _, height = size.partition("x")
+    mode = make_mode(width, height, round(float(rate or 60) * 1000))
+    _mode_cache[text] = mode
+    return mode
+
+# Parse an availableModes list once; identical lists share one tuple
+def parse_mode_list(texts):
+    key = tuple(texts)
+    modes = _mode_list_cache.get(key)
+    if modes is None:
+        modes = _mode_list_cache[key] = tuple(parse_mode(text) for text in key)
+    return modes
+
+# Sorted, deduplicated view of a monitor's modes with fast best-mode queries
+class ModeIndex:
+    __slots__ = ("modes", "sizes", "by_size")
+
+    def __init__(self, modes):
+        # Largest resolution first, highest refresh first within a resolution
+        self.modes = tuple(sorted(set(modes), key=lambda m: (-m.pixels, -m.width, -m.refresh_mhz)))
+        self.by_size = {}
+        for mode in self.modes:
+            self.by_size.setdefault((mode.width, mode.height), []).append(mode)
+        self.sizes = tuple(self.by_size)
+
+    # Highest refresh rate at the native (largest) resolution
+    def native(self):
+        return self.by_size[self.sizes[0]][0] if self.sizes else None
+
+    # Highest refresh rate at a given resolution, or None
+    def best_at(self, width, height):
+        modes = self.by_size.get((width, height))
+        return modes[0] if modes else None
+
+    # Mode at a resolution whose refresh rate is closest to refresh_mhz
+    def closest_at(self, width, height, refresh_mhz):
+        modes = self.by_size.get((width, height))
+        if not modes:
+            return None
+        return min(modes, key=lambda m: abs(m.refresh_mhz - refresh_mhz))
+
+# Shared ModeIndex for a monitor; monitors with the same mode list share one
+def mode_index(monitor):
+    index = _mode_index_cache.get(monitor.modes)
+    if index is None:
+        index = _mode_index_cache[monitor.modes] = ModeIndex(monitor.modes)
+    return index
+
+# Best resolution every monitor can drive natively, as {name: Mode}.
+# Refresh rates are matched to the slowest output's best rate at that size.
+# Returns None when the monitors share no resolution
+def best_common_mode(monitors):
+    indexes = [(mon, mode_index(mon)) for mon in monitors]
+    if not indexes:
+        return None
+    common = set(indexes[0][1].sizes)
+    for _, index in indexes[1:]:
+        common &= index.by_size.keys()
+    if not common:
+        return None
+    width, height = max(common, key=lambda s: (s[0] * s[1], s[0],
+                                               min(index.best_at(*s).refresh_mhz for _, index in indexes)))
+    target = min(index.best_at(width, height).refresh_mhz for _, index in indexes)
+    return {mon.name: index.closest_at(width, height, target) for mon, index in indexes}
+
+# One output as reported by hyprctl monitors -j
+class Monitor:
+    __slots__ = ("id", "name", "description", "make", "model", "serial", "mode", "x", "y",
+                 "scale", "transform", "primary", "focused", "disabled", "dpms", "mirror_of",
+                 "active_workspace", "modes")
+
+    def __init__(self, data):
+        self.id = data.get("id", -1)
+        self.name = data["name"]
+        self.description = data.get("description", "")
+        self.make = data.get("make", "")
+        self.model = data.get("model", "")
+        self.serial = data.get("serial", "")
+        self.mode = make_mode(data["width"], data["height"], round(float(data.get("refreshRate", 60)) * 1000))
+        self.x = data.get("x", 0)
+        self.y = data.get("y", 0)
+        self.scale = float(data.get("scale", 1.0))
+        self.transform = data.get("transform", 0)
+        self.focused = data.get("focused", False)
+        self.disabled = data.get("disabled", False)
+        # A laptop panel that is off (e.g. lid closed) is not the primary
+        self.primary = data.get("primary", False) or (self.name == "eDP-1" and not self.disabled)
+        self.dpms = data.get("dpmsStatus", True)
+        mirror_of = data.get("mirrorOf", "none")
+        self.mirror_of = None if mirror_of in ("none", "", None) else mirror_of
+        self.active_workspace = data.get("activeWorkspace", {}).get("id")
+        self.modes = parse_mode_list(data.get("availableModes") or [FALLBACK_MODE])
+        # refreshRate is more precise than the mode list; use the listed mode it rounds to
+        for mode in self.modes:
+            if (mode.width, mode.height) == (self.mode.width, self.mode.height) \
+                    and abs(mode.refresh_mhz - self.mode.refresh_mhz) < 10:
+                self.mode = mode
+                break
+        # Disabled outputs may report no current mode; fall back to the native one
+        if self.mode.width <= 0 or self.mode.height <= 0 or self.mode.refresh_mhz <= 0:
+            self.mode = mode_index(self).native()
+
+    def __repr__(self):
+        return f"Monitor({self.name}, {self.mode})"
+
+    @property
+    def width(self):
+        return self.mode.width
+
+    @property
+    def height(self):
+        return self.mode.height
+
+    @property
+    def refresh(self):
+        return self.mode.refresh
+
+    # Virtual output rather than a physical panel
+    @property
+    def headless(self):
+        return self.name.startswith(HEADLESS_PREFIX) or self.name in headless_names
+
+    # Stable identity across connectors and hotplug: make, model and serial
+    @property
+    def identity(self):
+        identity = " ".join(part for part in (self.make, self.model, self.serial) if part)
+        return identity or self.description or self.name
+
+    # Size in layout coordinates: rotated and divided by scale
+    @property
+    def logical_size(self):
+        width, height = self.width, self.height
+        if self.transform in ROTATED_TRANSFORMS:
+            width, height = height, width
+        return (round(width / self.scale), round(height / self.scale))
+
+    # hyprctl keyword monitor value placing this output at (x, y), or at a
+    # position keyword such as "auto" when x is a string. The rotation is
+    # kept, since layouts are built from the rotated logical size
+    def rule(self, x=0, y=0, mode=None, scale=None, extra=""):
+        position = x if isinstance(x, str) else f"{x}x{y}"
+        rule = f"{self.name},{(mode or self.mode).spec()},{position},{scale or self.scale:g}"
+        if self.transform:
+            rule += f",transform,{self.transform}"
+        return f"{rule},{extra}" if extra else rule
+
+# Build Monitor objects from hyprctl monitors -j output (text or parsed list)
+def parse_monitors(data):
+    if isinstance(data, str):
+        data = json.loads(data)
+    return [Monitor(item) for item in data]
+
+# Primary output: flagged primary or eDP-1, else the first one. Enabled
+# outputs win over disabled ones, and physical outputs over headless ones,
+# which only exist to be shared or streamed
+def find_primary(monitors):
+    enabled = [m for m in monitors if not m.disabled]
+    for candidates in ([m for m in enabled if not m.headless], enabled, monitors):
+        if candidates:
+            return next((m for m in candidates if m.primary), candidates[0])
+    return None
+
+# Monitors, workspaces, clients and the active workspace read in one batch
+class Snapshot:
+    __slots__ = ("taken_at", "monitors", "workspaces", "clients", "active_workspace")
+
+    def __init__(self, monitors, workspaces, clients, active_workspace):
+        self.taken_at = time.time()
+        self.monitors = parse_monitors(monitors)
+        self.workspaces = workspaces
+        self.clients = clients
+        self.active_workspace = active_workspace
+
+    def __repr__(self):
+        return (f"Snapshot({len(self.monitors)} monitors, {len(self.workspaces)} workspaces, "
+                f"{len(self.clients)} clients)")
+
+    def monitor(self, name):
+        return next((m for m in self.monitors if m.name == name), None)
+
+    def primary(self):
+        return find_primary(self.monitors)
+
+    def physical(self):
+        return [m for m in self.monitors if not m.headless]
+
+    def headless(self):
+        return [m for m in self.monitors if m.headless]
+
+# Take a consistent, timestamped view of the compositor in one round trip.
+# Clients keep only client_fields and are decoded one entry at a time
+def take_snapshot(client_fields=hypr_clients.CLIENT_FIELDS):
+    clients_at = SNAPSHOT_QUERIES.index("clients")
+    parsers = {clients_at: lambda text, pos: hypr_clients.decode_clients(text, pos, client_fields)}
+    return Snapshot(*hypr_ipc.batch_json(SNAPSHOT_QUERIES, parsers))
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+import tkinter as tk
+
+# Redraw at most this often while dragging (about one frame at 60 Hz)
+FRAME_MS = 16
+# Snap to another output's edge when within this many screen pixels
+SNAP_PX = 12
+MARGIN = 10
+
+# Outputs drawn as scaled rectangles that can be dragged around. Nothing is
+# sent while dragging; on release on_move(positions) gets the full layout,
+# {name: (x, y)} in logical pixels, if anything moved.
+class LayoutCanvas:
+    def __init__(self, parent, on_move, height=180, colors=None):
+        colors = colors or {}
+        self.on_move = on_move
+        self.fill = colors.get("fill", "#313244")
+        self.active_fill = colors.get("active", "#45475A")
+        self.outline = colors.get("outline", "#B4BEFE")
+        self.text = colors.get("text", "#CDD6F4")
+        self.canvas = tk.Canvas(parent, height=height, highlightthickness=0, bg=colors.get("background"))
+        self.canvas.pack(fill="x", expand=True)
+
+        self.monitors = []
+        self.positions = {}     # Current layout, updated while dragging
+        self.original = {}      # Layout as last read from Hyprland
+        self.items = {}         # name -> (rectangle id, text id)
+        self.scale = 1.0
+        self.origin = (0, 0)    # Logical coordinates of the canvas's top left
+
+        self._drag = None       # (name, pointer offset in logical pixels)
+        self._pointer = None    # Latest pointer position not drawn yet
+        self._frame_pending = False
+
+        self.canvas.bind("<Configure>", lambda event: self._fit() if self._drag is None else None)
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_motion)
+        self.canvas.bind("<ButtonRelease-1>", self._on_release)
+
+    # Show the enabled, non-mirrored outputs at their current positions
+    def set_monitors(self, monitors):
+        if self._drag is not None:
+            return  # Do not yank an output out from under the pointer
+        self.monitors = [m for m in monitors if not m.disabled and not m.mirror_of]
+        self.original = {m.name: (m.x, m.y) for m in self.monitors}
+        self.positions = dict(self.original)
+        self._fit()
+
+    # Pick a scale and origin that fit the whole layout, then draw it
+    def _fit(self):
+        self.canvas.delete("all")
+        self.items = {}
+        if not self.monitors:
+            return
+        x0 = min(self.positions[m.name][0] for m in self.monitors)
+        y0 = min(self.positions[m.name][1] for m in self.monitors)
+        x1 = max(self.positions[m.name][0] + m.logical_size[0] for m in self.monitors)
+        y1 = max(self.positions[m.name][1] + m.logical_size[1] for m in self.monitors)
+        width = max(self.canvas.winfo_width() - 2 * MARGIN, 1)
+        height = max(self.canvas.winfo_height() - 2 * MARGIN, 1)
+        # Leave room to drag an output past the current edges
+        self.scale = min(width / ((x1 - x0) * 1.5 or 1), height / ((y1 - y0) * 1.5 or 1))
+        self.origin = (x0 - ((width / self.scale) - (x1 - x0)) / 2 - MARGIN / self.scale,
+                       y0 - ((height / self.scale) - (y1 - y0)) / 2 - MARGIN / self.scale)
+        for mon in self.monitors:
+            rect = self.canvas.create_rectangle(0, 0, 0, 0, fill=self.fill, outline=self.outline, tags=(mon.name,))
+            label = self.canvas.create_text(0, 0, text=f"{mon.name}\n{mon.mode}", fill=self.text,
+                                            font=("Helvetica", 8), tags=(mon.name,))
+            self.items[mon.name] = (rect, label)
+            self._draw(mon)
+
+    def _to_screen(self, x, y):
+        return (x - self.origin[0]) * self.scale, (y - self.origin[1]) * self.scale
+
+    def _to_logical(self, x, y):
+        return x / self.scale + self.origin[0], y / self.scale + self.origin[1]
+
+    def _draw(self, mon):
+        x, y = self.positions[mon.name]
+        width, height = mon.logical_size
+        sx0, sy0 = self._to_screen(x, y)
+        sx1, sy1 = self._to_screen(x + width, y + height)
+        rect, label = self.items[mon.name]
+        self.canvas.coords(rect, sx0, sy0, sx1, sy1)
+        self.canvas.coords(label, (sx0 + sx1) / 2, (sy0 + sy1) / 2)
+
+    # Move x (or y) so an edge lines up with a nearby edge of another output
+    def _snap(self, mon, x, y):
+        width, height = mon.logical_size
+        limit = SNAP_PX / self.scale
+        best_x, best_y = (limit, x), (limit, y)
+        for other in self.monitors:
+            if other is mon:
+                continue
+            ox, oy = self.positions[other.name]
+            ow, oh = other.logical_size
+            for candidate in (ox + ow, ox - width, ox, ox + ow - width):
+                if abs(candidate - x) < best_x[0]:
+                    best_x = (abs(candidate - x), candidate)
+            for candidate in (oy + oh, oy - height, oy, oy + oh - height):
+                if abs(candidate - y) < best_y[0]:
+                    best_y = (abs(candidate - y), candidate)
+        return round(best_x[1]), round(best_y[1])
+
+    def _on_press(self, event):
+        current = self.canvas.find_withtag("current")
+        name = next((tag for tag in self.canvas.gettags(current[0]) if tag in self.positions), None) if current else None
+        if name is None:
+            return
+        px, py = self._to_logical(event.x, event.y)
+        x, y = self.positions[name]
+        self._drag = (name, (px - x, py - y))
+        self.canvas.itemconfigure(self.items[name][0], fill=self.active_fill)
+        self.canvas.tag_raise(name)
+
+    # Only remember the pointer; one redraw per frame picks up the latest
+    def _on_motion(self, event):
+        if self._drag is None:
+            return
+        self._pointer = (event.x, event.y)
+        if not self._frame_pending:
+            self._frame_pending = True
+            self.canvas.after(FRAME_MS, self._flush)
+
+    def _flush(self):
+        self._frame_pending = False
+        if self._drag is None or self._pointer is None:
+            return
+        name, (dx, dy) = self._drag
+        mon = next(m for m in self.monitors if m.name == name)
+        px, py = self._to_logical(*self._pointer)
+        self._pointer = None
+        self.positions[name] = self._snap(mon, px - dx, py - dy)
+        self._draw(mon)
+
+    def _on_release(self, event):
+        if self._drag is None:
+            return
+        self._pointer = (event.x, event.y)
+        self._flush()
+        name = self._drag[0]
+        self._drag = None
+        self.canvas.itemconfigure(self.items[name][0], fill=self.fill)
+        if self.positions != self.original:
+            self.on_move(dict(self.positions))
+
+    # Put everything back where Hyprland has it, e.g. after a rejected move
+    def reset(self):
+        self.positions = dict(self.original)
+        self._fit()
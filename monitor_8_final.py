@@ -1,13 +1,54 @@
 #!/usr/bin/env python3
 
+import atexit
+import sys
+import single_instance
+
+# Commands a second launch can forward to the running instance
+REMOTE_COMMANDS = ("show", "mirror", "extend", "undo", "redo")
+
+# Wallpaper cache workers import this script again, so everything that
+# touches the lock, Tk or Hyprland only runs in the real process
+if __name__ == "__main__":
+    startup_command = sys.argv[1] if len(sys.argv) > 1 else "show"
+    if startup_command not in REMOTE_COMMANDS:
+        print(f"Usage: {sys.argv[0]} [{'|'.join(REMOTE_COMMANDS)}]")
+        sys.exit(2)
+
+    # Hand the request to a running instance before paying for Tk startup
+    if not single_instance.acquire_lock():
+        reply = single_instance.send_command(startup_command)
+        print(f"Forwarded '{startup_command}' to running instance: {reply}")
+        sys.exit(0 if reply == "ok" else 1)
+
+    # Release the instance lock and control socket on exit
+    atexit.register(single_instance.release)
+    # Listen at once; commands wait in a queue until the GUI is ready
+    single_instance.serve_commands()
+
 import tkinter as tk
 from tkinter import ttk, messagebox
 import subprocess
-import json
-import os
-import atexit
 import threading
 import time
+import builtins
+
+import config_history
+import headless_outputs
+import hypr_config
+import hypr_ipc
+import hypr_layout
+import hypr_model
+import monitors_conf
+import operation_journal
+import wallpaper_index
+import wallpaper_select
+import transactions
+import window_layout
+import window_registry
+import workspace_memory
+from layout_canvas import LayoutCanvas
+from monitor_list import VirtualList
 
 # Catppuccin Mocha Theme Colors
 THEME = {
@@ -23,35 +64,14 @@ THEME = {
     "red": "#F38BA8"        # Error/warning
 }
 
-# Create lock file path
-LOCK_FILE = "/tmp/hyprland_monitor_manager.lock"
+# Last successfully fetched monitor list, disabled outputs included
+cached_monitors = []
 
-# Create lock file on startup
-def create_lock_file():
-    try:
-        with open(LOCK_FILE, 'w') as f:
-            f.write(str(os.getpid()))
-        print(f"Created lock file at {LOCK_FILE}")
-    except Exception as e:
-        print(f"Error creating lock file: {str(e)}")
+# Height of one row in the monitor list, in pixels
+MONITOR_ROW_HEIGHT = 42
 
-# Remove lock file on exit
-def remove_lock_file():
-    try:
-        if os.path.exists(LOCK_FILE):
-            os.remove(LOCK_FILE)
-            print(f"Removed lock file at {LOCK_FILE}")
-    except Exception as e:
-        print(f"Error removing lock file: {str(e)}")
-
-# Register cleanup function
-atexit.register(remove_lock_file)
-
-# Create lock file at startup
-create_lock_file()
-
-# Global to store original monitor states
-original_monitors = []
+# Duration in milliseconds of the last run of each timed operation
+operation_timings = {}
 
 # Run shell commands and return output
 def run_command(command):
@@ -72,47 +92,160 @@ def update_status(message):
         root.after(0, lambda: status_label.config(text=message))
     print(f"Status: {message}")
 
+# Record how long an operation took and show it in the timings label - thread-safe
+def record_timing(name, started):
+    operation_timings[name] = (time.perf_counter() - started) * 1000
+    text = "  ·  ".join(f"{key.capitalize()} {value:.0f} ms" for key, value in operation_timings.items())
+    if root and timing_label:
+        root.after(0, lambda: timing_label.config(text=text))
+    return operation_timings[name]
+
 # Refresh monitor frame - thread-safe
 def refresh_monitors_ui():
     if root:
         root.after(0, refresh_monitors)
 
-# Fetch monitor info using hyprctl
+# Fetch monitors, workspaces, clients and the active workspace in one batch
+def get_snapshot():
+    global cached_monitors
+    try:
+        snapshot = hypr_model.take_snapshot()
+    except (OSError, ValueError) as e:
+        print(f"get_snapshot error: {str(e)}")
+        return None
+    monitors = snapshot.monitors
+    print(f"Detected {len(monitors)} monitors: {[m.name + (' (disabled)' if m.disabled else '') for m in monitors]}")
+    cached_monitors = monitors
+    # Remember workspace placement; outputs that came back get theirs returned
+    workspace_memory.restore(snapshot)
+    return snapshot
+
+# Keep the live layout as an undo step and in monitors.conf so a reload
+# reproduces it. Skipped while a change waits in its countdown, so neither a
+# crash nor a reload can make an unconfirmed layout stick, and a reverted
+# one never reaches the history. Returns True if the layout was checked
+def save_layout():
+    if transactions.pending():
+        return False
+    try:
+        monitors = hypr_model.take_snapshot().monitors
+        config_history.record(monitors)
+        monitors_conf.write(monitors)
+    except (OSError, ValueError) as e:
+        print(f"Could not save monitors.conf: {str(e)}")
+        return False
+    return True
+
+# Fetch monitor info using hyprctl, disabled outputs included
 def get_monitors():
-    global original_monitors
-    output = run_command("hyprctl monitors -j")
-    if output.startswith("Error"):
-        print(f"get_monitors error: {output}")
-        return original_monitors if original_monitors else []
+    snapshot = get_snapshot()
+    if snapshot is None:
+        return cached_monitors
+    return snapshot.monitors
+
+# Start a revertible operation from the snapshot taken before it
+def begin_transaction(label, snapshot):
+    if snapshot is None:
+        return None
+    return transactions.begin(label, snapshot, on_revert=transaction_reverted, on_keep=transaction_kept)
+
+def transaction_reverted(transaction):
+    config_history.discard()
+    update_status(f"Reverted {transaction.label}")
+    root.after(500, refresh_monitors)
+
+# The user confirmed the new layout; only now does it become an undo step
+# and go to monitors.conf
+def transaction_kept(transaction):
+    config_history.confirm()
+    save_layout()
+
+# Journal a multi-step operation so a crash part-way can be recovered on
+# the next start. target holds the commands that produce the end state
+def journal_operation(label, snapshot, target):
+    before = [f"keyword monitor {rule}" for rule in transactions.monitor_rules(snapshot.monitors)]
+    operation_journal.begin(label, before, target)
+
+# Check the result of an operation and ask whether to keep it. Without an
+# answer the transaction's own timer reverts it, GUI or not
+def finish_transaction(transaction, expected=None):
+    operation_journal.finish()
+    if transaction is None:
+        return
     try:
-        monitors = json.loads(output)
-        print(f"Detected {len(monitors)} monitors: {[m['name'] for m in monitors]}")
-        if not original_monitors:  # Store initial state
-            original_monitors = monitors.copy()
-        return monitors
-    except json.JSONDecodeError:
-        print(f"Failed to parse JSON: {output}")
-        return original_monitors if original_monitors else []
-
-# Fetch available resolutions for a monitor
-def get_resolutions(monitor_name):
-    monitors = get_monitors()
-    for mon in monitors:
-        if mon["name"] == monitor_name:
-            return mon.get("availableModes", ["1920x1080@60Hz"])
-    return ["1920x1080@60Hz"]
+        _, problems = transaction.verify(expected)
+    except (OSError, ValueError) as e:
+        problems = [f"could not read the new state: {str(e)}"]
+    if "no output is lit" in problems:
+        update_status(f"{transaction.label} left no output lit, reverting")
+        transaction.revert("no output is lit")
+        return
+    if problems:
+        update_status(f"After {transaction.label}: {'; '.join(problems)}")
+    transaction.arm()
+    root.after(0, lambda: confirm_transaction(transaction))
+
+# An operation failed part-way: put the state from before it back at once
+# and settle its journal, so the next start does not offer to recover it
+def abort_transaction(transaction, reason):
+    operation_journal.finish()
+    if transaction is not None:
+        transaction.revert(reason)
+
+# {name: (x, y)} layout as expected fields for finish_transaction
+def expected_positions(layout):
+    return {name: {"x": x, "y": y, "disabled": False} for name, (x, y) in layout.items()}
+
+# "Keep this layout?" countdown - called on the Tk thread
+def confirm_transaction(transaction):
+    dialog = tk.Toplevel(root)
+    dialog.title("Keep this layout?")
+    dialog.configure(bg=THEME["base"])
+    dialog.transient(root)
+    label = ttk.Label(dialog, style="TLabel")
+    label.pack(padx=20, pady=10)
+
+    def keep():
+        transaction.keep()
+        dialog.destroy()
+
+    def revert():
+        threading.Thread(target=transaction.revert, daemon=True).start()
+        dialog.destroy()
+
+    def tick():
+        if transaction.state != "pending":
+            dialog.destroy()
+            return
+        label.configure(text=f"Keep this layout after {transaction.label}?\n"
+                             f"Reverting in {transaction.remaining():.0f} s")
+        dialog.after(250, tick)
+
+    buttons = ttk.Frame(dialog)
+    buttons.pack(pady=10)
+    ttk.Button(buttons, text="Keep", command=keep).pack(side="left", padx=5)
+    ttk.Button(buttons, text="Revert", command=revert).pack(side="left", padx=5)
+    dialog.protocol("WM_DELETE_WINDOW", revert)
+    tick()
 
 # Apply resolution and refresh rate in a separate thread
 def set_resolution_thread(monitor, resolution):
     def task():
         update_status(f"Setting {monitor} to {resolution}...")
-        res, rate = resolution.split("@")
-        cmd = f"hyprctl keyword monitor {monitor},{res}@{rate},auto,1"
+        try:
+            mode = hypr_model.parse_mode(resolution)
+        except ValueError:
+            update_status(f"Invalid resolution {resolution}")
+            return
+        transaction = begin_transaction(f"resolution change on {monitor}", get_snapshot())
+        cmd = f"hyprctl keyword monitor {monitor},{mode.spec()},auto,1"
         result = run_command(cmd)
         if "Error" in result:
             update_status(f"Failed to set {monitor} to {resolution}: {result}")
+            abort_transaction(transaction, "resolution change failed")
         else:
             update_status(f"Set {monitor} to {resolution}")
+            finish_transaction(transaction, {monitor: {"mode": mode}})
             time.sleep(0.5)
             refresh_wallpaper_thread()
         root.after(500, refresh_monitors)
@@ -126,25 +259,51 @@ def set_resolution(monitor, resolution):
 def toggle_monitor_thread(monitor, enable=True):
     def task():
         update_status(f"{'Enabling' if enable else 'Disabling'} {monitor}...")
-        monitors = get_monitors()
-        mon_info = next((m for m in monitors if m["name"] == monitor), None)
+        snapshot = get_snapshot()
+        monitors = snapshot.monitors if snapshot else []
+        mon_info = next((m for m in monitors if m.name == monitor), None)
         if not mon_info:
             update_status(f"Monitor {monitor} not found")
             return
 
-        if mon_info.get("primary", False) and not enable:
+        if mon_info.primary and not enable:
             update_status(f"Cannot disable primary monitor {monitor}")
             return
 
+        transaction = begin_transaction(f"{'enabling' if enable else 'disabling'} {monitor}", snapshot)
         if not enable:
+            # Move whole workspaces first so Hyprland has no windows to shuffle
+            start = time.perf_counter()
+            moved = evacuate_monitor(monitor, snapshot.primary().name, snapshot)
+            record_timing("evacuate", start)
+            start = time.perf_counter()
             cmd = f"hyprctl keyword monitor {monitor},disable"
             result = run_command(cmd)
+            record_timing("disable", start)
             if "Error" in result:
                 update_status(f"Failed to disable {monitor}: {result}")
+                abort_transaction(transaction, "disable failed")
             else:
-                update_status(f"{monitor} disabled")
+                update_status(f"{monitor} disabled: moved {moved} workspaces in "
+                              f"{operation_timings['evacuate']:.0f} ms, disabled in {operation_timings['disable']:.0f} ms")
+                finish_transaction(transaction, {monitor: {"disabled": True}})
                 time.sleep(0.5)
                 reset_ui_elements_thread()
+        else:
+            # The listed mode comes from monitors all, so no remembered state is needed
+            start = time.perf_counter()
+            cmd = f"hyprctl keyword monitor {mon_info.rule('auto')}"
+            result = run_command(cmd)
+            record_timing("enable", start)
+            if "Error" in result:
+                update_status(f"Failed to enable {monitor}: {result}")
+                abort_transaction(transaction, "enable failed")
+            else:
+                update_status(f"{monitor} enabled at {mon_info.mode} in {operation_timings['enable']:.0f} ms")
+                finish_transaction(transaction, {monitor: {"disabled": False}})
+                time.sleep(0.5)
+                get_snapshot()  # Sends remembered workspaces back
+                reset_ui_elements_thread()
         root.after(500, refresh_monitors)
     
     threading.Thread(target=task, daemon=True).start()
@@ -152,36 +311,65 @@ def toggle_monitor_thread(monitor, enable=True):
 def toggle_monitor(monitor, enable=True):
     toggle_monitor_thread(monitor, enable)
 
+# Put a monitor in DPMS standby or wake it in a separate thread. The output
+# stays configured, so workspaces stay put and waking needs no modeset
+def standby_monitor_thread(monitor, standby=True):
+    def task():
+        action = "standby" if standby else "wake"
+        update_status(f"{'Putting' if standby else 'Waking'} {monitor}{' in standby' if standby else ''}...")
+        transaction = begin_transaction(f"{action} of {monitor}", get_snapshot())
+        start = time.perf_counter()
+        reply = hypr_ipc.batch([f"dispatch dpms {'off' if standby else 'on'} {monitor}"])[0]
+        elapsed = record_timing(action, start)
+        if reply != "ok":
+            update_status(f"Failed to {action} {monitor}: {reply}")
+            abort_transaction(transaction, f"{action} failed")
+        else:
+            update_status(f"{monitor} {'in standby' if standby else 'awake'} ({elapsed:.0f} ms)")
+            if transaction is not None:
+                # Monitor rules do not carry DPMS, so the revert flips it back itself
+                transaction.undo.append(lambda: hypr_ipc.batch(
+                    [f"dispatch dpms {'on' if standby else 'off'} {monitor}"], transactions.REVERT_TIMEOUT))
+            finish_transaction(transaction, {monitor: {"dpms": not standby}})
+        root.after(200, refresh_monitors)
+    
+    threading.Thread(target=task, daemon=True).start()
+
+def standby_monitor(monitor, standby=True):
+    standby_monitor_thread(monitor, standby)
+
+# Move every workspace on a monitor to target in one batch.
+# Returns the number of workspaces moved
+def evacuate_monitor(monitor, target, snapshot):
+    workspaces = [ws["name"] for ws in snapshot.workspaces
+                  if ws.get("monitor") == monitor and not ws["name"].startswith("special")]
+    if not workspaces:
+        return 0
+    replies = hypr_ipc.batch(f"dispatch moveworkspacetomonitor {hypr_ipc.workspace_selector(name)} {target}"
+                             for name in workspaces)
+    failed = [name for name, reply in zip(workspaces, replies) if reply != "ok"]
+    if failed:
+        print(f"Could not move workspaces {failed} off {monitor}: {replies}")
+    return len(workspaces) - len(failed)
+
 # Refresh wallpaper for all monitors in a separate thread
 def refresh_wallpaper_thread():
     def task():
         update_status("Refreshing wallpapers...")
-        script_path = os.path.expanduser("~/.config/hypr/UserScripts/monitors/WallpaperSelectSimple.sh")
-        if os.path.exists(script_path):
-            swaybg_cmd = "pkill swaybg; systemctl --user restart hyprpaper.service"
-            run_command(swaybg_cmd)
-            update_status("Wallpapers refreshed")
-        else:
-            update_status(f"Wallpaper script not found at {script_path}")
+        monitors = [m for m in get_monitors() if not m.disabled]
+        update_status(wallpaper_select.reapply(monitors))
     
     threading.Thread(target=task, daemon=True).start()
 
 def refresh_wallpaper():
     refresh_wallpaper_thread()
 
-# Set wallpaper by calling the script in a separate thread
+# Pick and apply wallpapers to one or more monitors in a separate thread
 def set_wallpaper_thread(monitor):
     def task():
         update_status("Setting wallpaper...")
-        script_path = os.path.expanduser("~/.config/hypr/UserScripts/monitors/WallpaperSelectSimple.sh")
-        if os.path.exists(script_path):
-            result = run_command(f"bash {script_path}")
-            if "Error" in result:
-                update_status(f"Wallpaper script failed: {result}")
-            else:
-                update_status("Wallpaper selection triggered for focused monitor")
-        else:
-            update_status(f"Wallpaper script not found at {script_path}")
+        monitors = [m for m in cached_monitors or get_monitors() if not m.disabled]
+        update_status(wallpaper_select.select_and_apply(monitors))
     
     threading.Thread(target=task, daemon=True).start()
 
@@ -201,43 +389,50 @@ def reset_ui_elements_thread():
 def reset_ui_elements():
     reset_ui_elements_thread()
 
-# Move all windows to primary monitor in a separate thread
-def move_windows_to_primary_thread():
+# Move all windows to primary monitor in a separate thread. Callers that
+# already hold a snapshot pass it so the move works on the same view;
+# otherwise the live window registry answers without a compositor round trip
+def move_windows_to_primary_thread(snapshot=None):
     def task():
         update_status("Moving windows to primary monitor...")
-        monitors = get_monitors()
-        primary = next((m for m in monitors if m.get("primary", False) or m["name"] == "eDP-1"), monitors[0] if monitors else None)
+        current = snapshot
+        if current is None and window_registry.ready:
+            primary = hypr_model.find_primary(cached_monitors)
+            windows = window_registry.windows_not_on(primary.name) if primary else []
+        else:
+            current = current or get_snapshot()
+            primary = current.primary() if current else None
+            windows = current.clients if current else []
         
         if not primary:
             update_status("No primary monitor found to move windows to")
             return
             
-        window_list = run_command("hyprctl clients -j")
-        try:
-            windows = json.loads(window_list)
-            moved_count = 0
-            for window in windows:
-                if "address" in window:
-                    move_cmd = f"hyprctl dispatch movewindow mon:{primary['name']} address:{window['address']}"
-                    run_command(move_cmd)
-                    moved_count += 1
-            update_status(f"Moved {moved_count} windows to {primary['name']}")
-        except json.JSONDecodeError:
-            update_status("Failed to parse window list")
+        moved_count = 0
+        for window in windows:
+            if "address" in window:
+                move_cmd = f"hyprctl dispatch movewindow mon:{primary.name} address:{window['address']}"
+                run_command(move_cmd)
+                moved_count += 1
+        update_status(f"Moved {moved_count} windows to {primary.name}")
     
     threading.Thread(target=task, daemon=True).start()
 
-def move_windows_to_primary():
-    move_windows_to_primary_thread()
+def move_windows_to_primary(snapshot=None):
+    move_windows_to_primary_thread(snapshot)
 
 # Set display mode - EXTEND with reload buttons after setting mode
 def set_display_mode_thread(mode="extend"):
     def task():
         update_status(f"Setting display mode to {mode}...")
-        global original_monitors
-        monitors = get_monitors()
-        
-        working_monitors = original_monitors if len(original_monitors) > len(monitors) else monitors
+        snapshot = get_snapshot()
+        # Disabled outputs are listed too, so Extend can bring them back.
+        # Headless outputs are left running where they are
+        working_monitors = snapshot.physical() if snapshot else []
+        headless = [m for m in snapshot.headless() if not m.disabled] if snapshot else []
+        # Mirror leaves disabled outputs, such as a closed laptop panel, off
+        if mode == "mirror":
+            working_monitors = [m for m in working_monitors if not m.disabled]
         
         if not working_monitors:
             update_status("No monitors detected")
@@ -247,86 +442,122 @@ def set_display_mode_thread(mode="extend"):
             update_status("Need at least 2 monitors for mirror/extend")
             return
 
+        # Keep the working layout; a mirrored layout is never worth saving
+        if snapshot and not any(m.mirror_of for m in working_monitors):
+            window_layout.capture(snapshot)
+        transaction = begin_transaction(f"switching to {mode}", snapshot)
+
         run_command("pkill waybar")
         
         if mode == "mirror":
-            primary = next((m for m in working_monitors if m.get("primary", False) or m["name"] == "eDP-1"), working_monitors[0])
-            secondary_monitors = [m for m in working_monitors if m["name"] != primary["name"]]
-            res = f"{primary['width']}x{primary['height']}@{primary['refreshRate']}"
+            primary = snapshot.primary()
+            secondary_monitors = [m for m in working_monitors if m.name != primary.name]
+            # Pick a mode every output drives natively instead of forcing the primary's
+            modes = hypr_model.best_common_mode(working_monitors)
+            if modes is None:
+                update_status("No common resolution, mirroring at the primary's mode")
+                modes = {m.name: primary.mode for m in working_monitors}
+            res = modes[primary.name]
+            journal_operation("mirror", snapshot,
+                              [f"keyword monitor {primary.rule(0, 0, res)}"]
+                              + [f"keyword monitor {mon.rule(0, 0, modes[mon.name], extra=f'mirror,{primary.name}')}"
+                                 for mon in secondary_monitors])
             
             for mon in secondary_monitors:
-                cmd = f"hyprctl keyword monitor {mon['name']},disable"
+                operation_journal.step(f"disable {mon.name}")
+                cmd = f"hyprctl keyword monitor {mon.name},disable"
                 run_command(cmd)
                 time.sleep(0.5)
             
-            cmd = f"hyprctl keyword monitor {primary['name']},{res},0x0,1"
+            operation_journal.step(f"set {primary.name} to {res}")
+            cmd = f"hyprctl keyword monitor {primary.rule(0, 0, res)}"
             result = run_command(cmd)
             time.sleep(0.5)
             
             if "Error" in result:
-                update_status(f"Failed to set primary {primary['name']}: {result}")
+                update_status(f"Failed to set primary {primary.name}: {result}")
+                abort_transaction(transaction, f"setting {primary.name} failed")
                 reset_ui_elements_thread()
+                root.after(1000, refresh_monitors)
                 return
             
             for mon in secondary_monitors:
-                cmd = f"hyprctl keyword monitor {mon['name']},{res},0x0,1,mirror,{primary['name']}"
+                operation_journal.step(f"mirror {mon.name}")
+                cmd = f"hyprctl keyword monitor {mon.rule(0, 0, modes[mon.name], extra=f'mirror,{primary.name}')}"
                 result = run_command(cmd)
                 time.sleep(0.5)
                 
                 if "Error" in result:
-                    update_status(f"Failed to mirror {mon['name']} to {primary['name']}: {result}")
+                    update_status(f"Failed to mirror {mon.name} to {primary.name}: {result}")
                 else:
-                    update_status(f"Mirrored {mon['name']} to {primary['name']}")
+                    update_status(f"Mirrored {mon.name} to {primary.name}")
             
-            move_windows_to_primary()
-            update_status(f"All displays mirrored to {primary['name']} at {res}")
+            move_windows_to_primary(snapshot)
+            update_status(f"All displays mirrored to {primary.name} at {res}")
+            finish_transaction(transaction, {primary.name: {"disabled": False, "mode": res}})
             time.sleep(0.5)
             reset_ui_elements_thread()
             
         elif mode == "extend":
-            primary = next((m for m in working_monitors if m.get("primary", False) or m["name"] == "eDP-1"), working_monitors[0])
-            secondary_monitors = [m for m in working_monitors if m["name"] != primary["name"]]
+            primary = snapshot.primary()
+            secondary_monitors = [m for m in working_monitors if m.name != primary.name]
             
-            is_mirroring = False
-            for mon in working_monitors:
-                if mon.get("mirror", "") != "":
-                    is_mirroring = True
-                    break
+            is_mirroring = any(mon.mirror_of for mon in working_monitors)
+            # Headless outputs move to the right of the row instead of being torn down
+            layout = hypr_layout.beside([primary] + secondary_monitors,
+                                        hypr_layout.row_layout([primary] + secondary_monitors), headless)
+            # Checked before anything is torn down, as Arrange does
+            problems = hypr_layout.validate_layout([primary] + secondary_monitors + headless, layout, primary.name)
+            if problems:
+                update_status(f"Error: {'; '.join(problems)}")
+                reset_ui_elements_thread()
+                return
+            journal_operation("extend", snapshot,
+                              hypr_layout.layout_commands([primary] + secondary_monitors + headless, layout))
             
             if is_mirroring:
                 for mon in secondary_monitors:
-                    cmd = f"hyprctl keyword monitor {mon['name']},disable"
+                    operation_journal.step(f"disable {mon.name}")
+                    cmd = f"hyprctl keyword monitor {mon.name},disable"
                     run_command(cmd)
                     time.sleep(0.5)
-                cmd = f"hyprctl keyword monitor {primary['name']},{primary['width']}x{primary['height']}@{primary['refreshRate']},0x0,1"
+                cmd = f"hyprctl keyword monitor {primary.rule(0, 0)}"
                 run_command(cmd)
                 time.sleep(0.7)
             else:
                 for mon in secondary_monitors:
-                    cmd = f"hyprctl keyword monitor {mon['name']},disable"
+                    operation_journal.step(f"disable {mon.name}")
+                    cmd = f"hyprctl keyword monitor {mon.name},disable"
                     run_command(cmd)
                     time.sleep(0.3)
             
             time.sleep(0.5)
             
-            cmd = f"hyprctl keyword monitor {primary['name']},{primary['width']}x{primary['height']}@{primary['refreshRate']},0x0,1"
+            operation_journal.step(f"place {primary.name}")
+            cmd = f"hyprctl keyword monitor {primary.rule(0, 0)}"
             run_command(cmd)
             time.sleep(0.5)
             
-            x_offset = primary["width"]
+            # Bring every secondary back in one validated batch instead of one command each
+            operation_journal.step("place secondaries")
+            start = time.perf_counter()
+            try:
+                failures = dict(hypr_layout.apply_layout(working_monitors + headless, layout, primary.name))
+            except ValueError as e:
+                failures = {mon.name: str(e) for mon in secondary_monitors}
+            record_timing("extend", start)
             for mon in secondary_monitors:
-                cmd = f"hyprctl keyword monitor {mon['name']},{mon['width']}x{mon['height']}@{mon['refreshRate']},{x_offset}x0,1"
-                result = run_command(cmd)
-                
-                if "Error" in result:
-                    update_status(f"Failed to extend {mon['name']}: {result}")
+                if mon.name in failures:
+                    update_status(f"Failed to extend {mon.name}: {failures[mon.name]}")
                 else:
-                    update_status(f"Extended {mon['name']} at position {x_offset}x0")
-                
-                x_offset += mon["width"]
-                time.sleep(0.5)
+                    update_status(f"Extended {mon.name} at position {layout[mon.name][0]}x0")
+            time.sleep(0.5)
             
+            restored = get_snapshot()  # Returns remembered workspaces to re-enabled outputs
+            if restored:
+                window_layout.restore(restored)
             run_command("hyprctl dispatch workspace 1")
+            finish_transaction(transaction, expected_positions(layout))
             time.sleep(0.5)
             reset_ui_elements_thread()
             update_status("Reloading Hyprland buttons...")
@@ -343,15 +574,16 @@ def set_display_mode(mode="extend"):
 def arrange_monitors_thread():
     def task():
         update_status("Arranging monitors...")
-        global original_monitors
-        monitors = get_monitors()
-        if not monitors and not original_monitors:
+        snapshot = get_snapshot()
+        # Only physical outputs have positions to pick; headless ones follow them
+        working_monitors = snapshot.physical() if snapshot else []
+        headless = [m for m in snapshot.headless() if not m.disabled] if snapshot else []
+        if not working_monitors:
             update_status("No monitors to arrange")
             return
         
-        working_monitors = original_monitors if len(monitors) < len(original_monitors) else monitors
         if len(working_monitors) == 1:
-            cmd = f"hyprctl keyword monitor {working_monitors[0]['name']},{working_monitors[0]['width']}x{working_monitors[0]['height']}@{working_monitors[0]['refreshRate']},0x0,1"
+            cmd = f"hyprctl keyword monitor {working_monitors[0].rule(0, 0)}"
             run_command(cmd)
             update_status("Single monitor arranged at 0x0")
             time.sleep(0.5)
@@ -359,46 +591,54 @@ def arrange_monitors_thread():
             return
 
         pos_map = {"Left": 0, "Right": 1} if len(working_monitors) == 2 else {f"Pos {i}": i for i in range(len(working_monitors))}
-        positions = {mon["name"]: pos_map[pos_vars[mon["name"]].get()] for mon in working_monitors}
+        positions = {mon.name: pos_map.get(pos_choices.get(mon.name)) for mon in working_monitors}
         
-        sorted_monitors = sorted(working_monitors, key=lambda m: positions[m["name"]])
+        sorted_monitors = sorted(working_monitors, key=lambda m: positions[m.name])
         
-        pos_list = [positions[mon["name"]] for mon in working_monitors]
+        pos_list = [positions[mon.name] for mon in working_monitors]
         if len(pos_list) != len(set(pos_list)):
             update_status("Error: Duplicate position selections detected")
             return
 
-        primary = next((m for m in sorted_monitors if m.get("primary", False) or m["name"] == "eDP-1"), sorted_monitors[0])
-        secondary_monitors = [m for m in sorted_monitors if m["name"] != primary["name"]]
+        primary = snapshot.primary()
+        secondary_monitors = [m for m in sorted_monitors if m.name != primary.name]
+
+        # One row with the primary at 0x0 and headless outputs to its right,
+        # checked before anything is torn down
+        layout = hypr_layout.beside(sorted_monitors,
+                                    hypr_layout.anchor(hypr_layout.row_layout(sorted_monitors), primary.name),
+                                    headless)
+        sorted_monitors += headless
+        problems = hypr_layout.validate_layout(sorted_monitors, layout, primary.name)
+        if problems:
+            update_status(f"Error: {'; '.join(problems)}")
+            return
+        
+        if not any(m.mirror_of for m in working_monitors):
+            window_layout.capture(snapshot)
+        transaction = begin_transaction("arranging monitors", snapshot)
+        journal_operation("arrange", snapshot, hypr_layout.layout_commands(sorted_monitors, layout))
         
         for mon in secondary_monitors:
-            cmd = f"hyprctl keyword monitor {mon['name']},disable"
+            operation_journal.step(f"disable {mon.name}")
+            cmd = f"hyprctl keyword monitor {mon.name},disable"
             run_command(cmd)
             time.sleep(0.2)
         
         time.sleep(0.5)
         
-        left_offset = 0
-        for i in range(sorted_monitors.index(primary) - 1, -1, -1):
-            mon = sorted_monitors[i]
-            left_offset -= mon["width"]
-            cmd = f"hyprctl keyword monitor {mon['name']},{mon['width']}x{mon['height']}@{mon['refreshRate']},{left_offset}x0,1"
-            run_command(cmd)
-            time.sleep(0.5)
-        
-        cmd = f"hyprctl keyword monitor {primary['name']},{primary['width']}x{primary['height']}@{primary['refreshRate']},0x0,1"
-        run_command(cmd)
+        operation_journal.step("place all")
+        start = time.perf_counter()
+        for name, reply in hypr_layout.apply_layout(sorted_monitors, layout, primary.name):
+            update_status(f"Failed to place {name}: {reply}")
+        record_timing("arrange", start)
         time.sleep(0.5)
         
-        right_offset = primary["width"]
-        for i in range(sorted_monitors.index(primary) + 1, len(sorted_monitors)):
-            mon = sorted_monitors[i]
-            cmd = f"hyprctl keyword monitor {mon['name']},{mon['width']}x{mon['height']}@{mon['refreshRate']},{right_offset}x0,1"
-            run_command(cmd)
-            right_offset += mon["width"]
-            time.sleep(0.5)
-        
+        restored = get_snapshot()  # Returns remembered workspaces to re-enabled outputs
+        if restored:
+            window_layout.restore(restored)
         update_status("Monitors arranged successfully")
+        finish_transaction(transaction, expected_positions(layout))
         time.sleep(0.5)
         reset_ui_elements_thread()
         
@@ -409,26 +649,219 @@ def arrange_monitors_thread():
 def arrange_monitors():
     arrange_monitors_thread()
 
+# Place all enabled monitors as a row, stack or grid in one batch
+def apply_layout_thread(kind, columns=None, bezel=(0, 0)):
+    def task():
+        update_status(f"Applying {kind.lower()} layout...")
+        snapshot = get_snapshot()
+        monitors = [m for m in snapshot.monitors if not m.disabled] if snapshot else []
+        if not monitors:
+            update_status("No monitors to arrange")
+            return
+        primary = hypr_model.find_primary(monitors)
+        # Primary first, the rest in connector order so the wall is predictable
+        ordered = [primary] + sorted((m for m in monitors if m is not primary), key=lambda m: m.name)
+        try:
+            layout = hypr_layout.build_layout(kind, ordered, columns, bezel)
+            hypr_layout.check_layout(ordered, layout)
+        except ValueError as e:
+            update_status(str(e))
+            return
+
+        if not any(m.mirror_of for m in monitors):
+            window_layout.capture(snapshot)
+        transaction = begin_transaction(f"{kind.lower()} layout", snapshot)
+        start = time.perf_counter()
+        failures = hypr_layout.apply_layout(ordered, layout, primary.name)
+        record_timing("layout", start)
+        for name, reply in failures:
+            update_status(f"Failed to place {name}: {reply}")
+        restored = get_snapshot()
+        if restored:
+            window_layout.restore(restored)
+        if not failures:
+            update_status(f"Placed {len(ordered)} monitors as a {kind.lower()} in "
+                          f"{operation_timings['layout']:.0f} ms")
+        finish_transaction(transaction, expected_positions(layout))
+        root.after(1000, refresh_monitors)
+
+    threading.Thread(target=task, daemon=True).start()
+
+# Send a layout dragged on the arrangement canvas. Only outputs that moved
+# are sent, in one batch, and only after the drag is released
+def move_monitors_thread(positions):
+    def task():
+        snapshot = get_snapshot()
+        monitors = [m for m in snapshot.monitors if not m.disabled] if snapshot else []
+        moved = hypr_layout.moved_monitors(monitors, positions)
+        if not moved:
+            return
+        try:
+            hypr_layout.check_layout(monitors, positions)
+        except ValueError as e:
+            update_status(str(e))
+            root.after(0, layout_canvas.reset)
+            return
+        update_status(f"Moving {', '.join(m.name for m in moved)}...")
+        primary = hypr_model.find_primary(monitors)
+        transaction = begin_transaction(f"moving {', '.join(m.name for m in moved)}", snapshot)
+        start = time.perf_counter()
+        failures = hypr_layout.apply_layout(monitors, positions, primary.name, changed_only=True)
+        record_timing("move", start)
+        for name, reply in failures:
+            update_status(f"Failed to move {name}: {reply}")
+        if not failures:
+            update_status(f"Moved {len(moved)} monitors in {operation_timings['move']:.0f} ms")
+        finish_transaction(transaction, expected_positions({m.name: positions[m.name] for m in moved}))
+        root.after(500, refresh_monitors)
+
+    threading.Thread(target=task, daemon=True).start()
+
+# Monitor and workspace rules from the user's hyprland.conf tree, one
+# profile per file; the tool's own monitors.conf is the current state
+def config_profiles():
+    try:
+        return hypr_config.profiles(skip=(monitors_conf.CONF_FILE,))
+    except OSError as e:
+        print(f"Could not read Hyprland config: {str(e)}")
+        return {}
+
+# Apply the rules of one config file in a single batch
+def apply_profile_thread(label):
+    def task():
+        profile = config_profiles().get(label)
+        if profile is None:
+            update_status(f"No monitor rules found for {label}")
+            return
+        snapshot = get_snapshot()
+        monitors = snapshot.monitors if snapshot else []
+        try:
+            commands = hypr_config.profile_commands(profile, monitors)
+        except ValueError as e:
+            update_status(str(e))
+            return
+        update_status(f"Applying monitor rules from {label}...")
+        if not any(m.mirror_of for m in monitors):
+            window_layout.capture(snapshot)
+        transaction = begin_transaction(f"rules from {label}", snapshot)
+        start = time.perf_counter()
+        replies = hypr_ipc.batch(commands)
+        record_timing("profile", start)
+        failures = [(command, reply) for command, reply in zip(commands, replies) if reply != "ok"]
+        for command, reply in failures:
+            update_status(f"Failed: {command}: {reply}")
+        restored = get_snapshot()
+        if restored:
+            window_layout.restore(restored)
+        if not failures:
+            update_status(f"Applied {len(commands)} rules from {label} in {operation_timings['profile']:.0f} ms")
+        finish_transaction(transaction)
+        root.after(1000, refresh_monitors)
+
+    threading.Thread(target=task, daemon=True).start()
+
+def apply_profile():
+    if profile_var.get():
+        apply_profile_thread(profile_var.get())
+
+# Read the layout controls and apply them
+def apply_layout():
+    try:
+        columns = int(columns_var.get()) if columns_var.get().strip() else None
+        bezel = int(bezel_var.get() or 0)
+    except ValueError:
+        update_status("Columns and bezel must be whole numbers")
+        return
+    apply_layout_thread(layout_var.get(), columns, (bezel, bezel))
+
+# Create virtual outputs for screen sharing or streaming in a separate thread
+def create_headless_thread(count, mode, scale):
+    def task():
+        update_status(f"Creating {count} headless outputs...")
+        snapshot = get_snapshot()
+        transaction = begin_transaction("creating headless outputs", snapshot)
+        start = time.perf_counter()
+        try:
+            created = headless_outputs.create(count, mode, scale, snapshot)
+        except (OSError, ValueError) as e:
+            update_status(f"Failed to create headless outputs: {str(e)}")
+            abort_transaction(transaction, "create failed")
+            return
+        record_timing("headless", start)
+        update_status(f"Created {len(created)} headless outputs in {operation_timings['headless']:.0f} ms")
+        if transaction is not None:
+            transaction.undo.append(lambda: headless_outputs.destroy(created))
+        finish_transaction(transaction, {name: {"disabled": False} for name in created})
+        root.after(500, refresh_monitors)
+
+    threading.Thread(target=task, daemon=True).start()
+
+def create_headless():
+    try:
+        count = int(headless_count_var.get())
+        scale = float(headless_scale_var.get() or 1)
+        hypr_model.parse_mode(headless_mode_var.get())
+    except ValueError:
+        update_status("Count, mode (e.g. 1920x1080@60) and scale must be valid")
+        return
+    create_headless_thread(count, headless_mode_var.get(), scale)
+
+# Remove every managed virtual output in a separate thread
+def remove_headless_thread():
+    def task():
+        update_status("Removing headless outputs...")
+        transaction = begin_transaction("removing headless outputs", get_snapshot())
+        try:
+            removed = headless_outputs.destroy()
+        except OSError as e:
+            update_status(f"Failed to remove headless outputs: {str(e)}")
+            abort_transaction(transaction, "remove failed")
+            return
+        update_status(f"Removed {len(removed)} headless outputs")
+        if transaction is not None:
+            transaction.undo.append(lambda: headless_outputs.restore(removed))
+        finish_transaction(transaction)
+        root.after(500, refresh_monitors)
+
+    threading.Thread(target=task, daemon=True).start()
+
+def remove_headless():
+    remove_headless_thread()
+
 # Update other monitor's position when one changes (for 2 monitors)
 def update_position(changed_monitor):
-    monitors = get_monitors()
+    monitors = [m for m in cached_monitors if not m.headless]
     if len(monitors) == 2:
-        other_monitor = next(m["name"] for m in monitors if m["name"] != changed_monitor)
-        current_pos = pos_vars[changed_monitor].get()
-        other_pos = "Right" if current_pos == "Left" else "Left"
-        pos_vars[other_monitor].set(other_pos)
+        other_monitor = next(m.name for m in monitors if m.name != changed_monitor)
+        current_pos = pos_choices[changed_monitor]
+        pos_choices[other_monitor] = "Right" if current_pos == "Left" else "Left"
+        monitor_list.redraw()
 
 # Reload Hyprland configuration in a separate thread
+# The current layout is in monitors.conf, so a reload keeps it. When no other
+# config file changed since the last reload, the monitor rules are reapplied
+# with keywords instead
 def reload_hyprland_thread():
     def task():
+        save_layout()  # Brings monitors.conf up to date unless a change awaits confirmation
+        if monitors_conf.is_sourced() and monitors_conf.only_monitors_changed():
+            update_status("Reapplying monitor rules...")
+            start = time.perf_counter()
+            failures = monitors_conf.reapply()
+            record_timing("reapply", start)
+            for rule, reply in failures:
+                update_status(f"Failed to apply {rule}: {reply}")
+            if not failures:
+                update_status(f"Monitor rules reapplied in {operation_timings['reapply']:.0f} ms, no full reload needed")
+            root.after(1000, refresh_monitors)
+            return
         update_status("Reloading Hyprland...")
-        global original_monitors
         result = run_command("hyprctl reload")
         if "Error" in result:
             update_status(f"Failed to reload Hyprland: {result}")
         else:
+            monitors_conf.mark_loaded()
             update_status("Hyprland configuration reloaded")
-            original_monitors = []
             time.sleep(1)
             reset_ui_elements_thread()
         root.after(1000, refresh_monitors)
@@ -438,114 +871,338 @@ def reload_hyprland_thread():
 def reload_hyprland():
     reload_hyprland_thread()
 
-# Refresh monitor list and UI
+# Widgets of one pooled monitor row; bind_monitor_row fills them per monitor
+def make_monitor_row(parent):
+    frame = ttk.Frame(parent)
+    row = {"frame": frame, "name": None, "res_var": tk.StringVar(), "pos_var": tk.StringVar()}
+    row["label"] = ttk.Label(frame, width=24)
+    row["label"].grid(row=0, column=0, padx=5, pady=5, sticky="w")
+    row["res_menu"] = ttk.Combobox(frame, textvariable=row["res_var"], width=20)
+    row["res_menu"].grid(row=0, column=1, padx=5, pady=5)
+    row["set_res"] = ttk.Button(frame, text="Set Resolution")
+    row["set_res"].grid(row=0, column=2, padx=5, pady=5)
+    # Standby keeps the output configured; Disable tears it down
+    row["standby"] = ttk.Button(frame)
+    row["standby"].grid(row=0, column=3, padx=5, pady=5)
+    row["toggle"] = ttk.Button(frame)
+    row["toggle"].grid(row=0, column=4, padx=5, pady=5)
+    row["pos_menu"] = ttk.Combobox(frame, textvariable=row["pos_var"], width=8)
+    row["pos_menu"].grid(row=0, column=5, padx=5, pady=5)
+    row["apply_pos"] = ttk.Button(frame, text="Apply Position", command=arrange_monitors)
+    row["apply_pos"].grid(row=0, column=6, padx=5, pady=5)
+
+    # Choices belong to the monitor, not the row, so they survive scrolling
+    def remember(choices, var):
+        if row["name"] is not None:
+            choices[row["name"]] = var.get()
+    row["res_var"].trace_add("write", lambda *_: remember(res_choices, row["res_var"]))
+    row["pos_var"].trace_add("write", lambda *_: remember(pos_choices, row["pos_var"]))
+    row["pos_menu"].bind("<<ComboboxSelected>>", lambda event: update_position(row["name"]))
+    return row
+
+def bind_monitor_row(row, monitor):
+    mon_name = monitor.name
+    row["name"] = None  # Do not record the values set below as choices
+    label_text = f"{mon_name} (Primary)" if monitor.primary else f"{mon_name} (Disabled)" if monitor.disabled \
+        else f"{mon_name} (Headless)" if monitor.headless else f"{mon_name}"
+    row["label"].configure(text=label_text)
+    row["res_menu"].configure(values=[str(mode) for mode in hypr_model.mode_index(monitor).modes])
+    row["res_var"].set(res_choices.get(mon_name, str(monitor.mode)))
+    row["set_res"].configure(command=lambda m=mon_name, r=row["res_var"]: set_resolution(m, r.get()))
+    if monitor.primary:
+        row["standby"].grid_remove()
+        row["toggle"].grid_remove()
+    else:
+        row["toggle"].configure(text="Enable" if monitor.disabled else "Disable",
+                                command=lambda m=mon_name, e=monitor.disabled: toggle_monitor(m, e))
+        row["toggle"].grid()
+        # DPMS does nothing on an output that is not configured
+        if monitor.disabled:
+            row["standby"].grid_remove()
+        else:
+            row["standby"].configure(text="Standby" if monitor.dpms else "Wake",
+                                     command=lambda m=mon_name, s=monitor.dpms: standby_monitor(m, s))
+            row["standby"].grid()
+    # Headless outputs are placed after the physical ones, not picked
+    if monitor.headless:
+        row["pos_menu"].grid_remove()
+        row["apply_pos"].grid_remove()
+    else:
+        row["pos_menu"].configure(values=pos_options)
+        row["pos_menu"].grid()
+        row["apply_pos"].grid()
+    row["pos_var"].set(pos_choices.get(mon_name, ""))
+    row["name"] = mon_name
+
+# Refresh the monitor list. Rows are pooled by monitor_list, so this only
+# updates the data and the rows currently on screen
 def refresh_monitors():
-    global original_monitors
-    for widget in monitor_frame.winfo_children():
-        widget.destroy()
-    monitors = get_monitors()
-    working_monitors = original_monitors if len(monitors) < len(original_monitors) else monitors
-    global pos_vars
-    pos_vars = {}
-
-    for i, monitor in enumerate(working_monitors):
-        mon_name = monitor["name"]
-        is_primary = monitor.get("primary", False) or mon_name == "eDP-1"
-        
-        label_text = f"{mon_name} (Primary)" if is_primary else f"{mon_name}"
-        ttk.Label(monitor_frame, text=label_text).grid(row=i, column=0, padx=5, pady=5, sticky="w")
-        
-        resolutions = get_resolutions(mon_name)
-        res_var = tk.StringVar(value=f"{monitor['width']}x{monitor['height']}@{monitor['refreshRate']}Hz")
-        res_menu = ttk.Combobox(monitor_frame, textvariable=res_var, values=resolutions, width=20)
-        res_menu.grid(row=i, column=1, padx=5, pady=5)
-        
-        ttk.Button(monitor_frame, text="Set Resolution",
-                   command=lambda m=mon_name, r=res_var: set_resolution(m, r.get())).grid(row=i, column=2, padx=5, pady=5)
-        
-        if not is_primary:
-            ttk.Button(monitor_frame, text="Turn Off",
-                       command=lambda m=mon_name: toggle_monitor(m, False)).grid(row=i, column=3, padx=5, pady=5)
-        
-        pos_options = ["Left", "Right"] if len(working_monitors) == 2 else [f"Pos {i}" for i in range(len(working_monitors))]
-        pos_vars[mon_name] = tk.StringVar(value=pos_options[i])
-        pos_menu = ttk.Combobox(monitor_frame, textvariable=pos_vars[mon_name], values=pos_options, width=8)
-        pos_menu.grid(row=i, column=4, padx=5, pady=5)
-        pos_menu.bind("<<ComboboxSelected>>", lambda event, m=mon_name: update_position(m))
-        ttk.Button(monitor_frame, text="Apply Position",
-                   command=arrange_monitors).grid(row=i, column=5, padx=5, pady=5)
+    global pos_options
+    working_monitors = get_monitors()
+    physical = [m for m in working_monitors if not m.headless]
+    pos_options = ["Left", "Right"] if len(physical) == 2 else [f"Pos {i}" for i in range(len(physical))]
+    # Fresh data replaces any unapplied choices, as rebuilding the rows did
+    res_choices.clear()
+    pos_choices.clear()
+    for i, monitor in enumerate(physical):
+        pos_choices[monitor.name] = pos_options[i]
+    monitor_list.set_items(working_monitors)
+    layout_canvas.set_monitors(working_monitors)
+    # The config parse is cached by file mtimes, so this is cheap when unchanged
+    profile_menu.configure(values=sorted(config_profiles()))
+
+    # Pre-scale wallpapers for any new monitor modes in the background
+    wallpaper_index.warm_cache_async([m for m in working_monitors if not m.disabled])
+
+# Undo or redo the last configuration change in a separate thread
+def history_step_thread(undo=True):
+    def task():
+        action = "undo" if undo else "redo"
+        snapshot = get_snapshot()
+        if snapshot is None:
+            update_status(f"Cannot {action}: Hyprland is not reachable")
+            return
+        try:
+            step = config_history.plan(undo, snapshot.monitors)
+        except ValueError as e:
+            update_status(f"Cannot {action}: {str(e)}")
+            return
+        if step is None:
+            update_status(f"Nothing to {action}")
+            return
+        transaction = begin_transaction(action, snapshot)
+        start = time.perf_counter()
+        ok, message = config_history.apply(step)
+        record_timing(action, start)
+        update_status(message)
+        if ok:
+            finish_transaction(transaction)
+        else:
+            abort_transaction(transaction, f"{action} failed")
+        root.after(500, refresh_monitors)
+
+    threading.Thread(target=task, daemon=True).start()
+
+def undo_configuration(event=None):
+    history_step_thread(True)
+
+def redo_configuration(event=None):
+    history_step_thread(False)
+
+# Bring the window to the front - called on the Tk thread
+def show_window():
+    root.deiconify()
+    root.lift()
+    root.focus_force()
+
+# Handle a command forwarded by a second launch
+def handle_remote_command(command):
+    if command not in REMOTE_COMMANDS:
+        return f"error: unknown command {command}"
+    print(f"Received command: {command}")
+    if command == "show":
+        root.after(0, show_window)
+    elif command == "undo":
+        undo_configuration()
+    elif command == "redo":
+        redo_configuration()
+    else:
+        set_display_mode(command)
+    return "ok"
 
 # Add a function to handle window close event
 def on_closing():
-    remove_lock_file()
+    single_instance.release()
     root.destroy()
 
-# Build GUI with Catppuccin Mocha Theme
-root = tk.Tk()
-root.title("Hyprland Monitor Manager")
-root.geometry("900x500")
-root.resizable(True, True)
-root.configure(bg=THEME["base"])  # Set window background
-root.protocol("WM_DELETE_WINDOW", on_closing)
-
-# Style configuration
-style = ttk.Style()
-style.theme_use("default")  # Use default theme as base
-
-# Configure styles
-style.configure("TLabel", background=THEME["base"], foreground=THEME["text"], font=("Helvetica", 10))
-style.configure("TButton", background=THEME["surface0"], foreground=THEME["text"], padding=5)
-style.map("TButton", background=[("active", THEME["surface1"]), ("!active", THEME["surface0"])])
-style.configure("TFrame", background=THEME["mantle"])
-style.configure("TLabelframe", background=THEME["mantle"], foreground=THEME["lavender"])
-style.configure("TLabelframe.Label", background=THEME["mantle"], foreground=THEME["lavender"])
-style.configure("TCombobox", fieldbackground=THEME["surface0"], background=THEME["surface0"], foreground=THEME["text"])
-style.map("TCombobox", fieldbackground=[("readonly", THEME["surface0"])], selectbackground=[("readonly", THEME["surface1"])])
-
-# Status label
-status_label = ttk.Label(root, text="Ready", anchor="w", style="TLabel")
-status_label.pack(fill="x", padx=10, pady=5)
-
-# Monitor frame
-monitor_frame = ttk.LabelFrame(root, text="Monitors", padding=10)
-monitor_frame.pack(fill="both", expand=True, padx=10, pady=5)
-
-# Wallpaper frame
-wallpaper_frame = ttk.LabelFrame(root, text="Wallpaper", padding=10)
-wallpaper_frame.pack(fill="x", padx=10, pady=5)
-ttk.Button(wallpaper_frame, text="Select Wallpaper", command=lambda: set_wallpaper("focused")).pack(side="left", padx=5)
-ttk.Button(wallpaper_frame, text="Refresh All Wallpapers", command=refresh_wallpaper).pack(side="left", padx=5)
-
-# Display mode frame
-mode_frame = ttk.LabelFrame(root, text="Display Mode", padding=10)
-mode_frame.pack(fill="x", padx=10, pady=5)
-ttk.Button(mode_frame, text="Mirror", command=lambda: set_display_mode("mirror")).pack(side="left", padx=5)
-ttk.Button(mode_frame, text="Extend", command=lambda: set_display_mode("extend")).pack(side="left", padx=5)
-ttk.Button(mode_frame, text="Move Windows to Primary", command=move_windows_to_primary).pack(side="left", padx=5)
-ttk.Button(mode_frame, text="Refresh UI", command=reset_ui_elements).pack(side="left", padx=5)
-ttk.Button(mode_frame, text="Reload Hyprland", command=reload_hyprland).pack(side="right", padx=5)
-
-# Display logs in a scrolled text widget
-log_frame = ttk.LabelFrame(root, text="Logs", padding=10)
-log_frame.pack(fill="x", padx=10, pady=5)
-log_text = tk.Text(log_frame, height=5, width=80, bg=THEME["crust"], fg=THEME["subtext0"], insertbackground=THEME["lavender"])
-log_text.pack(side="left", fill="both", expand=True)
-log_scrollbar = ttk.Scrollbar(log_frame, orient="vertical", command=log_text.yview)
-log_scrollbar.pack(side="right", fill="y")
-log_text.config(yscrollcommand=log_scrollbar.set)
-
-# Override print to also show in the log widget
-original_print = print
-def custom_print(*args, **kwargs):
-    original_print(*args, **kwargs)
-    message = " ".join(str(arg) for arg in args)
-    if root and log_text:
-        root.after(0, lambda m=message: log_text.insert(tk.END, m + "\n") or log_text.see(tk.END))
-print = custom_print
-
-# Initial population
-pos_vars = {}
-refresh_monitors()
-
-# Start GUI
-root.mainloop()
\ No newline at end of file
+# Offer to finish or undo an operation that was cut short last time.
+# Returns True if a recovery was started
+def recover_interrupted_operation():
+    entry = operation_journal.unfinished()
+    if entry is None:
+        return False
+    done = ", ".join(entry["steps"]) or "nothing"
+    answer = messagebox.askyesnocancel(
+        "Interrupted operation",
+        f"'{entry['label']}' did not finish last time (completed: {done}).\n\n"
+        "Yes: finish it\nNo: restore the layout from before it\nCancel: leave the monitors as they are")
+    if answer is None:
+        operation_journal.finish()
+        return False
+
+    def task():
+        failures = operation_journal.recover(forward=answer)
+        update_status(f"{'Finished' if answer else 'Rolled back'} interrupted {entry['label']}"
+                      + (f", {len(failures)} commands failed" if failures else ""))
+        save_layout()
+        root.after(500, refresh_monitors)
+
+    threading.Thread(target=task, daemon=True).start()
+    return True
+
+# Ask once whether hyprland.conf may source monitors.conf - called on the Tk thread
+def ask_source_monitors_conf():
+    if not monitors_conf.should_ask_source():
+        return
+    allowed = messagebox.askyesno(
+        "Keep layout across reloads?",
+        f"Add '{monitors_conf.SOURCE_LINE}' to the end of {monitors_conf.HYPR_CONFIG}?\n\n"
+        "The confirmed monitor layout is kept in that file, so reloads and restarts keep it. "
+        "You will not be asked again.")
+    monitors_conf.set_source_choice(allowed)
+
+if __name__ == "__main__":
+    # Build GUI with Catppuccin Mocha Theme
+    root = tk.Tk()
+    root.title("Hyprland Monitor Manager")
+    root.geometry("900x800")
+    root.resizable(True, True)
+    root.configure(bg=THEME["base"])  # Set window background
+    root.protocol("WM_DELETE_WINDOW", on_closing)
+    # Ctrl+Shift+Z arrives as Control-Z (capital Z)
+    root.bind("<Control-z>", undo_configuration)
+    root.bind("<Control-Z>", redo_configuration)
+
+    # Style configuration
+    style = ttk.Style()
+    style.theme_use("default")  # Use default theme as base
+
+    # Configure styles
+    style.configure("TLabel", background=THEME["base"], foreground=THEME["text"], font=("Helvetica", 10))
+    style.configure("TButton", background=THEME["surface0"], foreground=THEME["text"], padding=5)
+    style.map("TButton", background=[("active", THEME["surface1"]), ("!active", THEME["surface0"])])
+    style.configure("TFrame", background=THEME["mantle"])
+    style.configure("TLabelframe", background=THEME["mantle"], foreground=THEME["lavender"])
+    style.configure("TLabelframe.Label", background=THEME["mantle"], foreground=THEME["lavender"])
+    style.configure("TCombobox", fieldbackground=THEME["surface0"], background=THEME["surface0"], foreground=THEME["text"])
+    style.map("TCombobox", fieldbackground=[("readonly", THEME["surface0"])], selectbackground=[("readonly", THEME["surface1"])])
+
+    # Status label
+    status_label = ttk.Label(root, text="Ready", anchor="w", style="TLabel")
+    status_label.pack(fill="x", padx=10, pady=5)
+
+    # Timings of standby, disable and other timed operations
+    timing_label = ttk.Label(root, text="", anchor="w", style="TLabel", foreground=THEME["subtext0"])
+    timing_label.pack(fill="x", padx=10)
+
+    # Monitor frame
+    monitor_frame = ttk.LabelFrame(root, text="Monitors", padding=10)
+    monitor_frame.pack(fill="both", expand=True, padx=10, pady=5)
+    monitor_list = VirtualList(monitor_frame, MONITOR_ROW_HEIGHT, make_monitor_row, bind_monitor_row, background=THEME["mantle"])
+
+    # Wallpaper frame
+    wallpaper_frame = ttk.LabelFrame(root, text="Wallpaper", padding=10)
+    wallpaper_frame.pack(fill="x", padx=10, pady=5)
+    ttk.Button(wallpaper_frame, text="Select Wallpaper", command=lambda: set_wallpaper("focused")).pack(side="left", padx=5)
+    ttk.Button(wallpaper_frame, text="Refresh All Wallpapers", command=refresh_wallpaper).pack(side="left", padx=5)
+
+    # Display mode frame
+    mode_frame = ttk.LabelFrame(root, text="Display Mode", padding=10)
+    mode_frame.pack(fill="x", padx=10, pady=5)
+    ttk.Button(mode_frame, text="Mirror", command=lambda: set_display_mode("mirror")).pack(side="left", padx=5)
+    ttk.Button(mode_frame, text="Extend", command=lambda: set_display_mode("extend")).pack(side="left", padx=5)
+    ttk.Button(mode_frame, text="Move Windows to Primary", command=move_windows_to_primary).pack(side="left", padx=5)
+    ttk.Button(mode_frame, text="Refresh UI", command=reset_ui_elements).pack(side="left", padx=5)
+    ttk.Button(mode_frame, text="Reload Hyprland", command=reload_hyprland).pack(side="right", padx=5)
+
+    # Arrangement frame: drag outputs to place them, applied on release
+    arrangement_frame = ttk.LabelFrame(root, text="Arrangement", padding=10)
+    arrangement_frame.pack(fill="x", padx=10, pady=5)
+    layout_canvas = LayoutCanvas(arrangement_frame, move_monitors_thread, colors={
+        "background": THEME["crust"], "fill": THEME["surface0"], "active": THEME["surface1"],
+        "outline": THEME["lavender"], "text": THEME["text"]})
+
+    # Layout frame: row, stack or grid/video wall with optional bezel compensation
+    layout_frame = ttk.LabelFrame(root, text="Layout", padding=10)
+    layout_frame.pack(fill="x", padx=10, pady=5)
+    layout_var = tk.StringVar(value="Grid")
+    ttk.Combobox(layout_frame, textvariable=layout_var, values=hypr_layout.LAYOUTS, width=8, state="readonly").pack(side="left", padx=5)
+    ttk.Label(layout_frame, text="Columns").pack(side="left", padx=5)
+    columns_var = tk.StringVar(value="")
+    ttk.Entry(layout_frame, textvariable=columns_var, width=4).pack(side="left")
+    ttk.Label(layout_frame, text="Bezel px").pack(side="left", padx=5)
+    bezel_var = tk.StringVar(value="0")
+    ttk.Entry(layout_frame, textvariable=bezel_var, width=4).pack(side="left")
+    ttk.Button(layout_frame, text="Apply Layout", command=apply_layout).pack(side="left", padx=5)
+    # Layouts already written as monitor= rules in hyprland.conf and its includes
+    profile_var = tk.StringVar(value="")
+    ttk.Button(layout_frame, text="Apply Profile", command=apply_profile).pack(side="right", padx=5)
+    profile_menu = ttk.Combobox(layout_frame, textvariable=profile_var, width=20, state="readonly")
+    profile_menu.pack(side="right", padx=5)
+    ttk.Label(layout_frame, text="Config profile").pack(side="right", padx=5)
+
+    # Headless frame: virtual outputs for screen sharing, VNC and streaming
+    headless_frame = ttk.LabelFrame(root, text="Headless Outputs", padding=10)
+    headless_frame.pack(fill="x", padx=10, pady=5)
+    ttk.Label(headless_frame, text="Count").pack(side="left", padx=5)
+    headless_count_var = tk.StringVar(value="1")
+    ttk.Entry(headless_frame, textvariable=headless_count_var, width=4).pack(side="left")
+    ttk.Label(headless_frame, text="Mode").pack(side="left", padx=5)
+    headless_mode_var = tk.StringVar(value=headless_outputs.DEFAULT_MODE)
+    ttk.Entry(headless_frame, textvariable=headless_mode_var, width=16).pack(side="left")
+    ttk.Label(headless_frame, text="Scale").pack(side="left", padx=5)
+    headless_scale_var = tk.StringVar(value="1")
+    ttk.Entry(headless_frame, textvariable=headless_scale_var, width=4).pack(side="left")
+    ttk.Button(headless_frame, text="Create", command=create_headless).pack(side="left", padx=5)
+    ttk.Button(headless_frame, text="Remove All", command=remove_headless).pack(side="left", padx=5)
+
+    # Display logs in a scrolled text widget
+    log_frame = ttk.LabelFrame(root, text="Logs", padding=10)
+    log_frame.pack(fill="x", padx=10, pady=5)
+    log_text = tk.Text(log_frame, height=5, width=80, bg=THEME["crust"], fg=THEME["subtext0"], insertbackground=THEME["lavender"])
+    log_text.pack(side="left", fill="both", expand=True)
+    log_scrollbar = ttk.Scrollbar(log_frame, orient="vertical", command=log_text.yview)
+    log_scrollbar.pack(side="right", fill="y")
+    log_text.config(yscrollcommand=log_scrollbar.set)
+
+    # Override print to also show in the log widget
+    original_print = print
+    def custom_print(*args, **kwargs):
+        original_print(*args, **kwargs)
+        message = " ".join(str(arg) for arg in args)
+        if root and log_text:
+            root.after(0, lambda m=message: log_text.insert(tk.END, m + "\n") or log_text.see(tk.END))
+    print = custom_print
+    builtins.print = custom_print  # Helper modules log through the same widget
+
+    # Initial population
+    pos_options = []
+    res_choices = {}   # monitor name -> resolution picked in its row
+    pos_choices = {}   # monitor name -> position picked in its row
+    refresh_monitors()
+
+    # Keep the layout in a sourced monitors.conf so reloads reproduce it, once
+    # the user agreed to the edit to hyprland.conf; nothing is written before
+    try:
+        ask_source_monitors_conf()
+    except OSError as e:
+        print(f"Could not save the monitors.conf choice: {str(e)}")
+
+    # A recovery saves the layout it ends on; otherwise save the live one
+    if not recover_interrupted_operation():
+        save_layout()
+
+    # Only now, with the file in place, may hyprland.conf source it
+    try:
+        monitors_conf.ensure_sourced()
+    except OSError as e:
+        print(f"Could not source monitors.conf: {str(e)}")
+    monitors_conf.mark_loaded()
+
+    # Handle commands from later launches, queued ones included, and run our own if one was given
+    single_instance.set_handler(handle_remote_command)
+    if startup_command != "show":
+        handle_remote_command(startup_command)
+
+    # Track windows per monitor and workspace from Hyprland's event socket
+    window_registry.start()
+    workspace_memory.start()
+
+    # Recreate saved virtual outputs, now and after every config reload
+    threading.Thread(target=headless_outputs.start, daemon=True).start()
+
+    # Pause animated wallpapers on outputs covered by fullscreen windows
+    threading.Thread(target=wallpaper_select.start_fullscreen_watch, daemon=True).start()
+
+    # Start GUI
+    root.mainloop()
\ No newline at end of file
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import tkinter as tk
+from tkinter import ttk
+
+# Scrollable list drawn on one canvas. Only the rows that fit in the view
+# have widgets; scrolling rebinds those same rows to other items, so the
+# widget count and refresh time do not grow with the number of items.
+class VirtualList:
+    def __init__(self, parent, row_height, make_row, bind_row, background=None):
+        self.row_height = row_height
+        self.make_row = make_row    # make_row(parent) -> row dict, "frame" holds its widget
+        self.bind_row = bind_row    # bind_row(row, item) fills a row for one item
+        self.items = []
+        self.rows = []              # Pooled row dicts, each with "window" and "index"
+
+        self.canvas = tk.Canvas(parent, highlightthickness=0, bg=background, yscrollincrement=row_height)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self._yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        for sequence in ("<Button-4>", "<Button-5>", "<MouseWheel>"):
+            self.canvas.bind(sequence, self._on_wheel)
+
+    # Show a new item list; rows already on screen are rebound in place
+    def set_items(self, items):
+        self.items = list(items)
+        self.canvas.configure(scrollregion=(0, 0, 0, len(self.items) * self.row_height))
+        for row in self.rows:
+            row["index"] = None  # Force a rebind, the items may have changed
+        self._render()
+
+    # Re-fill visible rows without changing the items
+    def redraw(self):
+        for row in self.rows:
+            row["index"] = None
+        self._render()
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self._render()
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self._yview("scroll", -1, "units")
+        else:
+            self._yview("scroll", 1, "units")
+
+    def _on_configure(self, event):
+        for row in self.rows:
+            self.canvas.itemconfigure(row["window"], width=event.width)
+        self._render()
+
+    # A pooled row, created the first time the view needs that many
+    def _new_row(self):
+        row = self.make_row(self.canvas)
+        row["index"] = None
+        row["window"] = self.canvas.create_window(0, 0, anchor="nw", window=row["frame"],
+                                                  width=self.canvas.winfo_width(), height=self.row_height)
+        # Wheel events over the row widgets scroll the list too
+        for widget in [row["frame"], *row["frame"].winfo_children()]:
+            for sequence in ("<Button-4>", "<Button-5>", "<MouseWheel>"):
+                widget.bind(sequence, self._on_wheel, add="+")
+        self.rows.append(row)
+        return row
+
+    # Place pooled rows over the visible part of the list. Item i always uses
+    # row i % pool size, so scrolling only rebinds the rows coming into view
+    def _render(self):
+        top = self.canvas.canvasy(0)
+        first = max(int(top // self.row_height), 0)
+        visible = self.canvas.winfo_height() // self.row_height + 2
+        while len(self.rows) < min(visible, len(self.items)):
+            self._new_row()
+        shown = set()
+        for index in range(first, min(first + len(self.rows), len(self.items))):
+            row = self.rows[index % len(self.rows)]
+            shown.add(id(row))
+            self.canvas.coords(row["window"], 0, index * self.row_height)
+            self.canvas.itemconfigure(row["window"], state="normal")
+            if row["index"] != index:
+                self.bind_row(row, self.items[index])
+                row["index"] = index
+        for row in self.rows:
+            if id(row) not in shown:
+                self.canvas.itemconfigure(row["window"], state="hidden")
+                row["index"] = None
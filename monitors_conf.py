@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import threading
+
+import atomic_file
+import hypr_config
+import hypr_ipc
+import transactions
+
+CONFIG_DIR = os.path.expanduser("~/.config/hypr")
+HYPR_CONFIG = os.path.join(CONFIG_DIR, "hyprland.conf")
+CONF_FILE = os.path.join(CONFIG_DIR, "monitors.conf")
+SOURCE_LINE = "source = ~/.config/hypr/monitors.conf"
+# Whether the user agreed to have the source line added to hyprland.conf
+CHOICE_FILE = os.path.expanduser("~/.config/hyprland_monitor_manager/monitors_conf.json")
+HEADER = "# Managed by Hyprland Monitor Manager - edits here are overwritten\n"
+
+# Text of monitors.conf as last written or read, to skip identical writes
+_written = None
+# Whether the note about Hyprland's autoreload was printed
+_autoreload_noted = False
+# mtimes of the user's own config files at the last full reload
+_config_mtimes = None
+_lock = threading.Lock()
+
+# monitors.conf text for a set of monitors
+def render(monitors):
+    return HEADER + "".join(f"monitor = {rule}\n" for rule in transactions.monitor_rules(monitors))
+
+# Write monitors.conf atomically if the layout changed and the user allowed
+# the file. Returns True if written
+def write(monitors):
+    global _written, _autoreload_noted
+    if not allowed():
+        return False
+    text = render(monitors)
+    with _lock:
+        if _written is None:
+            try:
+                with open(CONF_FILE) as f:
+                    _written = f.read()
+            except OSError:
+                _written = ""
+        if text == _written:
+            return False
+        atomic_file.write_text(CONF_FILE, text)
+        _written = text
+    print(f"Saved {text.count(chr(10)) - 1} monitor rules to {CONF_FILE}")
+    if is_sourced() and autoreload_enabled():
+        # Hyprland reloads its whole config for this write. The rules match the
+        # live layout, so the monitors stay put, and every file is loaded now
+        mark_loaded()
+        if not _autoreload_noted:
+            _autoreload_noted = True
+            print("Hyprland reloads its config after each save of monitors.conf; "
+                  "set misc:disable_autoreload = true to avoid that")
+    return True
+
+# Whether Hyprland reloads its config by itself when a file it reads changes
+def autoreload_enabled():
+    try:
+        option = json.loads(hypr_ipc.request("j/getoption misc:disable_autoreload"))
+    except (OSError, ValueError):
+        return False
+    return isinstance(option, dict) and not option.get("int", 0)
+
+# Whether hyprland.conf, or a file it includes, sources monitors.conf
+def is_sourced():
+    return CONF_FILE in hypr_config.read_config(HYPR_CONFIG)["sources"]
+
+# True or False once the user answered whether hyprland.conf may source
+# monitors.conf, None if they were never asked
+def source_choice():
+    try:
+        with open(CHOICE_FILE) as f:
+            choice = json.load(f).get("source")
+    except (OSError, json.JSONDecodeError, AttributeError):
+        return None
+    return choice if isinstance(choice, bool) else None
+
+def set_source_choice(allowed):
+    atomic_file.write_json(CHOICE_FILE, {"source": bool(allowed)})
+
+# Whether the tool may keep monitors.conf: the user agreed to source it, or
+# their hyprland.conf sources it already
+def allowed():
+    return source_choice() is True or is_sourced()
+
+# Whether to ask about sourcing: hyprland.conf exists, does not source
+# monitors.conf yet, and the user was never asked
+def should_ask_source():
+    return os.path.exists(HYPR_CONFIG) and source_choice() is None and not is_sourced()
+
+# Add the source line at the end of hyprland.conf, so these rules win over
+# earlier monitor= lines. Only done once the user allowed it and the file
+# holds a layout, since an autoreload picks the line up at once.
+# Returns True if the line was added
+def ensure_sourced():
+    if not source_choice() or not os.path.exists(HYPR_CONFIG) or not os.path.exists(CONF_FILE) or is_sourced():
+        return False
+    with open(HYPR_CONFIG, "a") as f:
+        f.write(f"\n# Monitor layout managed by Hyprland Monitor Manager\n{SOURCE_LINE}\n")
+    print(f"Added '{SOURCE_LINE}' to {HYPR_CONFIG}")
+    return True
+
+# Rules currently in monitors.conf
+def rules():
+    try:
+        with open(CONF_FILE) as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    found = []
+    for line in lines:
+        key, _, value = line.split("#", 1)[0].partition("=")
+        if key.strip() == "monitor" and value.strip():
+            found.append(value.strip())
+    return found
+
+# Apply monitors.conf with targeted keywords in one batch instead of a full
+# reload. Returns [(rule, reply)] failures
+def reapply():
+    current = rules()
+    replies = hypr_ipc.batch(f"keyword monitor {rule}" for rule in current)
+    return [(rule, reply) for rule, reply in zip(current, replies) if reply != "ok"]
+
+# mtimes of the files hyprland.conf reads, leaving out the one we manage
+def _mtimes():
+    mtimes = {}
+    for path in hypr_config.config_files(HYPR_CONFIG):
+        if path != CONF_FILE:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+    return mtimes
+
+# Note the config files as Hyprland last loaded them
+def mark_loaded():
+    global _config_mtimes
+    _config_mtimes = _mtimes()
+
+# True when only monitor rules can have changed since the last full reload,
+# so reapply() is enough
+def only_monitors_changed():
+    return _config_mtimes is not None and _mtimes() == _config_mtimes
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import threading
+import time
+
+import hypr_ipc
+
+JOURNAL_FILE = os.path.expanduser("~/.cache/hyprland_monitor_manager/journal.jsonl")
+
+# The journal holds at most one operation: a "begin" record with the
+# commands that restore the state before it and the commands that produce
+# its target, then one "step" record per completed step. It is removed when
+# the operation ends, so a journal left on disk means the tool died mid-way.
+_lock = threading.Lock()
+
+# Append one record and make sure it reached the disk before returning
+def _append(record, mode="a"):
+    os.makedirs(os.path.dirname(JOURNAL_FILE), exist_ok=True)
+    with open(JOURNAL_FILE, mode) as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+# Start journaling an operation; replaces any earlier journal
+def begin(label, before, target):
+    with _lock:
+        _append({"op": "begin", "label": label, "time": time.time(),
+                 "before": list(before), "target": list(target)}, mode="w")
+
+# Record a step before it is carried out
+def step(description):
+    with _lock:
+        if os.path.exists(JOURNAL_FILE):
+            _append({"op": "step", "step": description})
+
+# The operation completed; nothing is left to recover
+def finish():
+    with _lock:
+        try:
+            os.remove(JOURNAL_FILE)
+        except FileNotFoundError:
+            pass
+
+# The interrupted operation as {"label", "time", "before", "target", "steps"},
+# or None. A torn last line from a crash mid-write is ignored
+def unfinished():
+    try:
+        with open(JOURNAL_FILE) as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    entry = None
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            break
+        if record.get("op") == "begin":
+            entry = {key: record.get(key) for key in ("label", "time", "before", "target")}
+            entry["steps"] = []
+        elif record.get("op") == "step" and entry is not None:
+            entry["steps"].append(record.get("step"))
+    return entry
+
+# Roll an interrupted operation forward to its target or back to the state
+# before it, in one batch, then clear the journal. Returns the failed replies
+def recover(forward):
+    entry = unfinished()
+    if entry is None:
+        return []
+    commands = entry["target"] if forward else entry["before"]
+    start = time.perf_counter()
+    replies = hypr_ipc.batch(commands)
+    failures = [reply for reply in replies if reply != "ok"]
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{'Finished' if forward else 'Rolled back'} interrupted {entry['label']} "
+          f"with {len(commands)} commands in {elapsed:.0f} ms"
+          + (f", {len(failures)} failed" if failures else ""))
+    finish()
+    return failures
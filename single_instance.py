@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import fcntl
+import os
+import socket
+import threading
+import time
+
+LOCK_FILE = "/tmp/hyprland_monitor_manager.lock"
+RUNTIME_DIR = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+CONTROL_SOCKET = os.path.join(RUNTIME_DIR, f"hyprland_monitor_manager-{os.getuid()}.sock")
+
+_lock_fd = None
+_server = None
+# Commands that arrive before the GUI is ready wait here for set_handler
+_handler = None
+_pending = []
+_handler_lock = threading.Lock()
+
+# Take the instance lock. Returns False if another instance holds it
+def acquire_lock():
+    global _lock_fd
+    fd = os.open(LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return False
+    os.ftruncate(fd, 0)
+    os.write(fd, str(os.getpid()).encode())
+    _lock_fd = fd
+    return True
+
+# Send a command to the running instance and return its reply. Retries
+# briefly in case that instance is still starting its control socket
+def send_command(command, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(CONTROL_SOCKET)
+                sock.sendall(command.encode() + b"\n")
+                return sock.makefile().readline().strip()
+        except OSError as e:
+            if time.monotonic() >= deadline:
+                return f"error: {str(e)}"
+            time.sleep(0.05)
+
+# Hand a command to the handler, or queue it until there is one
+def _dispatch(command):
+    with _handler_lock:
+        if _handler is None:
+            _pending.append(command)
+            return "ok"
+        return _handler(command)
+
+def _serve(server):
+    while True:
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            return
+        with conn:
+            try:
+                conn.settimeout(1.0)
+                command = conn.makefile().readline().strip()
+                reply = _dispatch(command)
+                conn.sendall((reply or "ok").encode() + b"\n")
+            except Exception as e:
+                print(f"Control socket error: {str(e)}")
+
+# Listen for forwarded commands. Start this right after taking the lock, so a
+# second launch never finds the socket missing while this instance starts up
+def serve_commands():
+    global _server
+    if os.path.exists(CONTROL_SOCKET):
+        os.remove(CONTROL_SOCKET)  # Left over from a killed instance; we hold the lock
+    _server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    _server.bind(CONTROL_SOCKET)
+    os.chmod(CONTROL_SOCKET, 0o600)
+    _server.listen(4)
+    threading.Thread(target=_serve, args=(_server,), daemon=True).start()
+    print(f"Listening for commands on {CONTROL_SOCKET}")
+
+# Start handling commands, queued ones first; handler(command) returns the reply text
+def set_handler(handler):
+    global _handler
+    with _handler_lock:
+        for command in _pending:
+            handler(command)
+        _pending.clear()
+        _handler = handler
+
+# Close the control socket and drop the lock
+def release():
+    global _server, _lock_fd
+    if _server:
+        _server.close()
+        _server = None
+        try:
+            os.remove(CONTROL_SOCKET)
+        except OSError:
+            pass
+    if _lock_fd is not None:
+        os.close(_lock_fd)
+        _lock_fd = None
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+
+import hypr_ipc
+import hypr_model
+
+# Seconds the user has to keep a new layout before it is reverted
+REVERT_SECONDS = 15
+# Seconds the revert batch may take; the revert runs even if the GUI is stuck
+REVERT_TIMEOUT = 2.0
+
+# The transaction waiting for confirmation, if any
+current = None
+_current_lock = threading.Lock()
+
+# keyword monitor values that put every output back as it is in monitors.
+# Sources come before their mirrors and disabled outputs go last, so
+# workspaces always have somewhere to land
+def monitor_rules(monitors):
+    def order(mon):
+        return 2 if mon.disabled else 1 if mon.mirror_of else 0
+    # Some Hyprland versions report the mirror source by id rather than name
+    names = {str(mon.id): mon.name for mon in monitors}
+    rules = []
+    for mon in sorted(monitors, key=order):
+        if mon.disabled:
+            rules.append(f"{mon.name},disable")
+            continue
+        extra = f"mirror,{names.get(str(mon.mirror_of), mon.mirror_of)}" if mon.mirror_of else ""
+        rules.append(mon.rule(mon.x, mon.y, extra=extra))
+    return rules
+
+# One mutating operation: the state before it, a check of the state after
+# it, and a timer that puts the old state back unless the user keeps it
+class Transaction:
+    def __init__(self, label, before, on_revert=None, on_keep=None):
+        self.label = label
+        self.before = before          # Snapshot taken before anything changed
+        self.on_revert = on_revert    # Called with the transaction after a revert
+        self.on_keep = on_keep        # Called with the transaction once it is kept
+        self.undo = []                # Callables run before the rules on revert, for
+                                      # changes rules cannot express (DPMS, new outputs)
+        self.state = "open"           # open -> pending -> kept or reverted
+        self.deadline = None
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"Transaction({self.label}, {self.state})"
+
+    # Compare the live state with what the operation meant to do.
+    # expected is {name: {attribute: value}}, e.g. {"DP-1": {"disabled": False}}.
+    # Returns (snapshot, problems); a layout with no lit output is always a problem
+    def verify(self, expected=None):
+        after = hypr_model.take_snapshot()
+        problems = []
+        if not any(not m.disabled and m.dpms for m in after.monitors):
+            problems.append("no output is lit")
+        for name, fields in (expected or {}).items():
+            mon = after.monitor(name)
+            if mon is None:
+                problems.append(f"{name} is missing")
+                continue
+            for field, value in fields.items():
+                actual = getattr(mon, field)
+                if actual != value:
+                    problems.append(f"{name} {field} is {actual}, expected {value}")
+        return after, problems
+
+    # Start the countdown. The timer thread reverts on its own, so a frozen
+    # GUI cannot leave the user stuck with a blank screen
+    def arm(self, seconds=REVERT_SECONDS):
+        with self._lock:
+            if self.state != "open":
+                return
+            self.state = "pending"
+            self.deadline = time.monotonic() + seconds
+            self._timer = threading.Timer(seconds, self.revert, kwargs={"reason": "not confirmed"})
+            self._timer.daemon = True
+            self._timer.start()
+
+    # Seconds left before the automatic revert
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic()) if self.deadline else 0.0
+
+    # Keep the new state. Returns False if it was already reverted
+    def keep(self):
+        with self._lock:
+            if self.state == "reverted":
+                return False
+            if self._timer:
+                self._timer.cancel()
+            self.state = "kept"
+        print(f"Kept layout after {self.label}")
+        if self.on_keep:
+            self.on_keep(self)
+        return True
+
+    # Put the snapshot back in one batch. Returns False if already settled
+    def revert(self, reason="requested"):
+        with self._lock:
+            if self.state in ("kept", "reverted"):
+                return False
+            if self._timer:
+                self._timer.cancel()
+            self.state = "reverted"
+        start = time.perf_counter()
+        for step in reversed(self.undo):
+            try:
+                step()
+            except (OSError, ValueError) as e:
+                print(f"Revert of {self.label}: {str(e)}")
+        rules = monitor_rules(self.before.monitors)
+        replies = hypr_ipc.batch((f"keyword monitor {rule}" for rule in rules), REVERT_TIMEOUT)
+        failures = sum(1 for reply in replies if reply != "ok")
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Reverted {self.label} ({reason}): {len(rules)} outputs in {elapsed:.0f} ms"
+              + (f", {failures} failed" if failures else ""))
+        if self.on_revert:
+            self.on_revert(self)
+        return True
+
+# Whether a change is waiting in its countdown, neither kept nor reverted
+def pending():
+    transaction = current
+    return transaction is not None and transaction.state == "pending"
+
+# Start a transaction from a snapshot taken before the change. A transaction
+# still waiting for confirmation is kept, since the user moved on from it
+def begin(label, before, on_revert=None, on_keep=None):
+    global current
+    transaction = Transaction(label, before, on_revert, on_keep)
+    with _current_lock:
+        previous, current = current, transaction
+    if previous is not None and previous.state == "pending":
+        previous.keep()
+    return transaction
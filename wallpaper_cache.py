@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from hypr_model import ROTATED_TRANSFORMS
+
+# Pillow is optional - without it wallpapers are applied at source resolution
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+WALLPAPER_DIR = os.path.expanduser("~/Pictures/wallpapers")
+CACHE_DIR = os.path.expanduser("~/.cache/hyprland_monitor_manager/wallpapers")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif")
+THUMBNAIL_SIZE = (320, 180)
+
+# Digests already computed in this process, keyed by (path, mtime, size).
+# Byte-identical files share a digest and so share their cache entries
+_digest_memo = {}
+
+# Hash image contents in chunks so large files never sit fully in memory
+def image_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Return the content hash for a file, reusing it while the file is unchanged
+def cached_image_hash(path):
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    digest = _digest_memo.get(key)
+    if digest is None:
+        digest = image_hash(path)
+        _digest_memo[key] = digest
+    return digest
+
+# Location of a cache entry for (image hash, target size, scale)
+def cache_path(digest, width, height, scale=1.0, ext=".png"):
+    scale_tag = f"{float(scale):g}".replace(".", "_")
+    return os.path.join(CACHE_DIR, digest[:2], f"{digest}_{width}x{height}_s{scale_tag}{ext}")
+
+# JPEG sources stay JPEG, everything else is stored as PNG
+def _cache_ext(path):
+    return ".jpg" if path.lower().endswith((".jpg", ".jpeg")) else ".png"
+
+# Pixel size swww renders at for a monitor, taking rotation into account
+def monitor_target(monitor):
+    width, height = monitor.width, monitor.height
+    if monitor.transform in ROTATED_TRANSFORMS:
+        width, height = height, width
+    return (width, height, monitor.scale)
+
+# Unique (width, height, scale) targets for a monitor list
+def targets_for_monitors(monitors):
+    return sorted({monitor_target(mon) for mon in monitors})
+
+# List wallpaper images under a directory
+def find_images(directory=WALLPAPER_DIR):
+    images = []
+    for dirpath, _, filenames in os.walk(directory):
+        for name in filenames:
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                images.append(os.path.join(dirpath, name))
+    return sorted(images)
+
+# Scale to cover the target and crop the center, like swww's default resize
+def _cover(img, width, height):
+    ratio = max(width / img.width, height / img.height)
+    size = (max(width, round(img.width * ratio)), max(height, round(img.height * ratio)))
+    img = img.resize(size, Image.LANCZOS)
+    left = (img.width - width) // 2
+    top = (img.height - height) // 2
+    return img.crop((left, top, left + width, top + height))
+
+# Worker: render one cache entry. Runs in a pool process, so it must not print
+def _render(path, dest, width, height, thumbnail):
+    if os.path.exists(dest):
+        return dest, None
+    try:
+        with Image.open(path) as img:
+            # draft() lets the JPEG decoder downscale while decoding
+            img.draft("RGB", (width, height))
+            img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+            if thumbnail:
+                img.thumbnail((width, height), Image.LANCZOS)
+            else:
+                img = _cover(img, width, height)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            tmp = f"{dest}.{os.getpid()}.tmp"
+            if dest.endswith(".jpg"):
+                img.convert("RGB").save(tmp, "JPEG", quality=95)
+            else:
+                img.save(tmp, "PNG")
+            os.replace(tmp, dest)
+        return dest, None
+    except Exception as e:
+        return dest, str(e)
+
+# Process pool whose workers come from a fork server. The GUI process runs
+# Tk and several threads, and forking it directly can deadlock the children
+def _make_pool(workers=None):
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                               mp_context=multiprocessing.get_context("forkserver"))
+
+# Thumbnail path for an image, or None if not generated yet
+def thumbnail_path(path):
+    digest = cached_image_hash(path)
+    dest = cache_path(digest, THUMBNAIL_SIZE[0], THUMBNAIL_SIZE[1], 1.0, ".png")
+    return dest if os.path.exists(dest) else None
+
+# First frame of an animated wallpaper as a PNG, or None without Pillow
+def static_frame(path):
+    if Image is None:
+        return None
+    try:
+        # A 0x0 target marks a frame kept at source resolution
+        dest = cache_path(cached_image_hash(path), 0, 0, 1.0, ".png")
+        if not os.path.exists(dest):
+            with Image.open(path) as img:
+                img.seek(0)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                img.convert("RGBA").save(dest, "PNG")
+        return dest
+    except Exception as e:
+        print(f"Cannot extract frame from {path}: {str(e)}")
+        return None
+
+# Pre-scaled wallpaper for a monitor, falling back to the source image
+def scaled_wallpaper(path, monitor):
+    if path.lower().endswith(".gif"):
+        return path
+    try:
+        width, height, scale = monitor_target(monitor)
+        dest = cache_path(cached_image_hash(path), width, height, scale, _cache_ext(path))
+    except (OSError, KeyError, ValueError):
+        return path
+    return dest if os.path.exists(dest) else path
+
+# Generate missing thumbnails and per-monitor wallpapers across all cores
+def build_cache(images, targets, workers=None):
+    if Image is None:
+        print("Pillow not installed, skipping wallpaper cache")
+        return 0
+    jobs = []
+    for path in images:
+        try:
+            digest = cached_image_hash(path)
+        except OSError as e:
+            print(f"Cannot hash {path}: {str(e)}")
+            continue
+        thumb = cache_path(digest, THUMBNAIL_SIZE[0], THUMBNAIL_SIZE[1], 1.0, ".png")
+        if not os.path.exists(thumb):
+            jobs.append((path, thumb, THUMBNAIL_SIZE[0], THUMBNAIL_SIZE[1], True))
+        # Animated GIFs are handed to swww untouched
+        if path.lower().endswith(".gif"):
+            continue
+        for width, height, scale in targets:
+            dest = cache_path(digest, width, height, scale, _cache_ext(path))
+            if not os.path.exists(dest):
+                jobs.append((path, dest, width, height, False))
+    if not jobs:
+        return 0
+
+    built = 0
+    with _make_pool(workers) as pool:
+        for dest, error in pool.map(_render, *zip(*jobs), chunksize=4):
+            if error:
+                print(f"Wallpaper cache failed for {dest}: {error}")
+            else:
+                built += 1
+    print(f"Wallpaper cache: built {built} of {len(jobs)} entries")
+    return built
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import threading
+
+import atomic_file
+import wallpaper_cache
+from wallpaper_cache import Image
+
+# NumPy is optional - it vectorizes the perceptual hash and duplicate search
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+INDEX_FILE = os.path.expanduser("~/.cache/hyprland_monitor_manager/wallpaper_index.json")
+# Maximum differing bits between two 64-bit dHashes for a re-encoded duplicate
+PHASH_THRESHOLD = 4
+# The dHash ignores colour and scale, so perceptual matches must also have
+# mean RGB channels this close (0-255) and the same aspect ratio
+COLOR_TOLERANCE = 8
+ASPECT_TOLERANCE = 0.01
+
+# {path: {"mtime": ns, "size": bytes, "hash": hex, "phash": int or None,
+#         "color": [r, g, b] or None, "aspect": float or None, "pixels": int}}
+_index = None
+_index_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+# 64-bit difference hash, comparing neighbouring pixels of a 9x8 grayscale
+# image, and the mean colour of the same image, which the hash cannot see
+def perceptual_hash(img):
+    img.draft("RGB", (64, 64))
+    small = img.convert("RGB").resize((9, 8), Image.LANCZOS)
+    color = [round(sum(channel) / len(channel)) for channel in zip(*small.getdata())]
+    gray = small.convert("L")
+    if np is not None:
+        px = np.asarray(gray, dtype=np.int16)
+        bits = np.packbits(px[:, 1:] > px[:, :-1])
+        return int.from_bytes(bits.tobytes(), "big"), color
+    px = list(gray.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (px[row * 9 + col + 1] > px[row * 9 + col])
+    return value, color
+
+# Worker: content hash, perceptual hash, mean colour, aspect ratio and pixel
+# count for one file
+def _hash_file(path):
+    try:
+        digest = wallpaper_cache.image_hash(path)
+    except OSError as e:
+        return path, None, None, None, None, 0, str(e)
+    phash, color, aspect, pixels = None, None, None, 0
+    if Image is not None:
+        try:
+            with Image.open(path) as img:
+                pixels = img.width * img.height
+                aspect = img.width / img.height
+                phash, color = perceptual_hash(img)
+        except Exception:
+            pass
+    return path, digest, phash, color, aspect, pixels, None
+
+def _load_index():
+    try:
+        with open(INDEX_FILE) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def _save_index(index):
+    atomic_file.write_json(INDEX_FILE, index)
+
+# Hash only new or modified files; drop entries for files that are gone
+def update_index(directory=wallpaper_cache.WALLPAPER_DIR):
+    global _index
+    with _index_lock:
+        index = _index if _index is not None else _load_index()
+        images = wallpaper_cache.find_images(directory)
+        present = set(images)
+        stale = [path for path in index if path.startswith(directory) and path not in present]
+        for path in stale:
+            del index[path]
+
+        pending = {}
+        for path in images:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = index.get(path)
+            # Entries from before colour was indexed are hashed again
+            if not entry or entry["mtime"] != st.st_mtime_ns or entry["size"] != st.st_size \
+                    or "color" not in entry:
+                pending[path] = st
+
+        if len(pending) > 1:
+            with wallpaper_cache._make_pool() as pool:
+                results = list(pool.map(_hash_file, list(pending), chunksize=8))
+        else:
+            results = [_hash_file(path) for path in pending]
+        for path, digest, phash, color, aspect, pixels, error in results:
+            if error:
+                print(f"Cannot index {path}: {error}")
+                continue
+            st = pending[path]
+            index[path] = {"mtime": st.st_mtime_ns, "size": st.st_size, "hash": digest,
+                           "phash": phash, "color": color, "aspect": aspect, "pixels": pixels}
+
+        if pending or stale or _index is None:
+            _save_index(index)
+        _index = index
+        if pending:
+            print(f"Wallpaper index: hashed {len(pending)} new or modified images")
+
+        # Let the cache reuse these digests instead of hashing again
+        for path, entry in index.items():
+            wallpaper_cache._digest_memo[(path, entry["mtime"], entry["size"])] = entry["hash"]
+        return {path: index[path] for path in images if path in index}
+
+# Number of set bits in each element of a uint64 array
+def _popcount(values):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    values = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    values = (values & np.uint64(0x3333333333333333)) + ((values >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    values = (values + (values >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (values * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+# Second check for a perceptual match: same mean colour and aspect ratio
+def _similar(a, b):
+    if not a.get("color") or not b.get("color") or not a.get("aspect") or not b.get("aspect"):
+        return False
+    if any(abs(x - y) > COLOR_TOLERANCE for x, y in zip(a["color"], b["color"])):
+        return False
+    return abs(a["aspect"] - b["aspect"]) <= ASPECT_TOLERANCE * max(a["aspect"], b["aspect"])
+
+# Group paths that are byte-identical or perceptually identical
+def duplicate_groups(entries, threshold=PHASH_THRESHOLD):
+    paths = sorted(entries)
+    parent = list(range(len(paths)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(a, b):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+
+    by_hash = {}
+    for i, path in enumerate(paths):
+        first = by_hash.setdefault(entries[path]["hash"], i)
+        if first != i:
+            union(first, i)
+
+    # One frame says little about an animation, so GIFs only match byte-for-byte
+    hashed = [i for i in by_hash.values()
+              if entries[paths[i]].get("phash") is not None and not paths[i].lower().endswith(".gif")]
+    phashes = [entries[paths[i]]["phash"] for i in hashed]
+    if np is not None and phashes:
+        values = np.array(phashes, dtype=np.uint64)
+        for k in range(len(values) - 1):
+            close = np.nonzero(_popcount(values[k + 1:] ^ values[k]) <= threshold)[0]
+            for offset in close:
+                j = k + 1 + int(offset)
+                if _similar(entries[paths[hashed[k]]], entries[paths[hashed[j]]]):
+                    union(hashed[k], hashed[j])
+    else:
+        for k in range(len(phashes)):
+            for j in range(k + 1, len(phashes)):
+                if bin(phashes[k] ^ phashes[j]).count("1") <= threshold \
+                        and _similar(entries[paths[hashed[k]]], entries[paths[hashed[j]]]):
+                    union(hashed[k], hashed[j])
+
+    groups = {}
+    for i, path in enumerate(paths):
+        groups.setdefault(find(i), []).append(path)
+    # The largest image represents its group; ties go to the shortest path
+    return [sorted(group, key=lambda p: (-entries[p].get("pixels", 0), len(p), p))
+            for group in groups.values()]
+
+# One representative per duplicate group. Only byte-identical files share
+# cache entries; a merely similar image keeps its own pixels
+def unique_images(directory=wallpaper_cache.WALLPAPER_DIR):
+    entries = update_index(directory)
+    groups = duplicate_groups(entries)
+    if len(groups) < len(entries):
+        print(f"Wallpaper index: {len(entries)} images, {len(entries) - len(groups)} duplicates hidden")
+    return sorted(group[0] for group in groups)
+
+# Index new images, then warm the cache for unique images and current modes
+def warm_cache_async(monitors, directory=wallpaper_cache.WALLPAPER_DIR):
+    if Image is None or not monitors or not os.path.isdir(directory):
+        return
+
+    def task():
+        if not _build_lock.acquire(blocking=False):
+            return
+        try:
+            images = unique_images(directory)
+            wallpaper_cache.build_cache(images, wallpaper_cache.targets_for_monitors(monitors))
+        finally:
+            _build_lock.release()
+
+    threading.Thread(target=task, daemon=True).start()
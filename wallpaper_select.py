@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import hypr_events
+import hypr_ipc
+import hypr_model
+import wallpaper_cache
+import wallpaper_index
+
+ALL_MONITORS = "All monitors"
+TRANSITION_TYPE = "simple"
+TRANSITION_DURATION = 5
+# Pixels swww may animate per second across all outputs in one apply, in
+# megapixels. Override with HYPR_MONITOR_TRANSITION_BUDGET
+TRANSITION_BUDGET_MPX = float(os.environ.get("HYPR_MONITOR_TRANSITION_BUDGET", "400"))
+MIN_TRANSITION_FPS = 15
+MAX_TRANSITION_FPS = 255  # swww stores fps as a u8
+FULLSCREEN_EVENTS = ("fullscreen", "workspacev2", "focusedmon", "closewindow")
+
+_daemon_ready = False
+
+# Wallpaper last applied per monitor, and monitors showing a fullscreen client
+current_wallpapers = {}
+covered_monitors = set()
+_state_lock = threading.Lock()
+
+# Run an argument list without a shell, returning (ok, output)
+def _run(args, input_text=None):
+    try:
+        result = subprocess.run(args, input=input_text, capture_output=True, text=True)
+    except OSError as e:
+        return False, str(e)
+    return result.returncode == 0, (result.stdout if result.returncode == 0 else result.stderr).strip()
+
+# Start swww-daemon if needed. Only checked once per process
+def ensure_swww_daemon(timeout=3.0):
+    global _daemon_ready
+    if _daemon_ready:
+        return True
+    ok, _ = _run(["swww", "query"])
+    if not ok:
+        print("Starting swww-daemon")
+        try:
+            subprocess.Popen(["swww-daemon", "--format", "xrgb"], stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL, start_new_session=True)
+        except OSError as e:
+            print(f"Failed to start swww-daemon: {str(e)}")
+            return False
+        deadline = time.monotonic() + timeout
+        while not ok and time.monotonic() < deadline:
+            time.sleep(0.1)
+            ok, _ = _run(["swww", "query"])
+    _daemon_ready = ok
+    return ok
+
+# Show a rofi dmenu and return the selected lines
+def rofi_menu(prompt, entries, multi=False, extra_args=()):
+    args = ["rofi", "-dmenu", "-i", "-p", prompt, *extra_args]
+    if multi:
+        args.append("-multi-select")
+    ok, output = _run(args, "\n".join(entries))
+    if not ok:
+        return []
+    return [line for line in output.splitlines() if line]
+
+# Ask which monitors to set; "All monitors" or a multi-selection both work
+def select_monitors(monitors):
+    names = [mon.name for mon in monitors]
+    entries = [ALL_MONITORS] + names if len(names) > 1 else names
+    chosen = rofi_menu("Select Monitor(s)", entries, multi=True)
+    if ALL_MONITORS in chosen:
+        return names
+    return [name for name in names if name in chosen]
+
+# Ask for a wallpaper, showing cached thumbnails as rofi icons
+def select_wallpaper(images):
+    labels = {}
+    lines = []
+    for path in images:
+        label = os.path.relpath(path, wallpaper_cache.WALLPAPER_DIR)
+        labels[label] = path
+        thumb = wallpaper_cache.thumbnail_path(path)
+        lines.append(f"{label}\0icon\x1f{thumb}" if thumb else label)
+    chosen = rofi_menu("Select Wallpaper", lines, extra_args=(
+        "-show-icons", "-theme-str", "window {width: 50%; height: 60%;}"))
+    return labels.get(chosen[0]) if chosen else None
+
+# Transition fps per monitor: each output's refresh rate, scaled down evenly
+# when the combined pixel rate would exceed the budget
+def transition_fps(monitors, budget_mpx=None):
+    budget = (budget_mpx if budget_mpx is not None else TRANSITION_BUDGET_MPX) * 1_000_000
+    rates = {mon.name: max(1.0, mon.refresh) for mon in monitors}
+    cost = sum(rates[mon.name] * mon.mode.pixels for mon in monitors)
+    factor = min(1.0, budget / cost) if cost else 1.0
+    return {name: max(MIN_TRANSITION_FPS, min(MAX_TRANSITION_FPS, int(rate * factor)))
+            for name, rate in rates.items()}
+
+# swww img command for one monitor
+def swww_command(monitor, path, fps=None, transition=TRANSITION_TYPE):
+    if fps is None:
+        fps = transition_fps([monitor])[monitor.name]
+    return ["swww", "img", "-o", monitor.name, wallpaper_cache.scaled_wallpaper(path, monitor),
+            "--transition-fps", str(fps), "--transition-type", transition,
+            "--transition-duration", str(TRANSITION_DURATION)]
+
+# Animated wallpapers are swapped for a still frame on covered outputs
+def _is_animated(path):
+    return path.lower().endswith(".gif")
+
+# Image to show on a monitor given its fullscreen state
+def _effective_wallpaper(name, path):
+    if _is_animated(path) and name in covered_monitors:
+        return wallpaper_cache.static_frame(path) or path
+    return path
+
+# Apply {monitor name: image path} to all outputs concurrently
+def apply_wallpapers(assignments, monitors):
+    by_name = {mon.name: mon for mon in monitors}
+    targets = [(by_name[name], path) for name, path in assignments.items() if name in by_name]
+    if not targets:
+        return {}
+    if not ensure_swww_daemon():
+        return {mon.name: "swww-daemon is not running" for mon, _ in targets}
+
+    fps = transition_fps([mon for mon, _ in targets])
+    with _state_lock:
+        commands = [swww_command(mon, _effective_wallpaper(mon.name, path), fps[mon.name])
+                    for mon, path in targets]
+    with ThreadPoolExecutor(max_workers=len(commands)) as pool:
+        results = list(pool.map(_run, commands))
+
+    failures = {}
+    for (mon, path), (ok, output) in zip(targets, results):
+        if ok:
+            with _state_lock:
+                current_wallpapers[mon.name] = path
+            print(f"Wallpaper {os.path.basename(path)} set on {mon.name} at {fps[mon.name]} fps")
+        else:
+            failures[mon.name] = output
+            print(f"swww img failed on {mon.name}: {output}")
+    return failures
+
+# Full interactive flow: pick monitors, pick one wallpaper, apply in parallel
+def select_and_apply(monitors, directory=wallpaper_cache.WALLPAPER_DIR):
+    if not monitors:
+        return "No monitors detected"
+    names = select_monitors(monitors)
+    if not names:
+        return "Wallpaper selection cancelled"
+    images = wallpaper_index.unique_images(directory)
+    if not images:
+        return f"No wallpapers found in {directory}"
+    choice = select_wallpaper(images)
+    if not choice:
+        return "Wallpaper selection cancelled"
+
+    failures = apply_wallpapers({name: choice for name in names}, monitors)
+    applied = [name for name in names if name not in failures]
+    if applied:
+        _run(["notify-send", f"Wallpaper set on {', '.join(applied)}"])
+    if failures:
+        return f"Wallpaper failed on {', '.join(failures)}"
+    return f"Wallpaper set on {', '.join(applied)}"
+
+# Apply every output's current wallpaper again, e.g. at the cached size for a
+# new mode. Returns a status message
+def reapply(monitors):
+    if not current_wallpapers:
+        _load_swww_state()
+    with _state_lock:
+        assignments = {mon.name: current_wallpapers[mon.name] for mon in monitors
+                       if mon.name in current_wallpapers}
+    if not assignments:
+        return "No wallpapers to refresh"
+    failures = apply_wallpapers(assignments, monitors)
+    if failures:
+        return f"Wallpaper refresh failed on {', '.join(failures)}"
+    return f"Wallpapers refreshed on {', '.join(assignments)}"
+
+# Seed current wallpapers from swww so GIFs set outside the tool are handled
+def _load_swww_state():
+    ok, output = _run(["swww", "query"])
+    if not ok:
+        return
+    pattern = re.compile(r"^:?\s*([^:\s]+): .*currently displaying: image: (.+)$")
+    with _state_lock:
+        for line in output.splitlines():
+            match = pattern.match(line)
+            if match:
+                current_wallpapers.setdefault(match.group(1), match.group(2).strip())
+
+# Monitors whose active workspace has a fullscreen client
+def _fullscreen_monitors():
+    try:
+        monitors, workspaces = hypr_ipc.batch_json(["monitors", "workspaces"])
+        fullscreen_ids = {ws["id"] for ws in workspaces if ws.get("hasfullscreen")}
+        return {mon.name for mon in hypr_model.parse_monitors(monitors)
+                if mon.active_workspace in fullscreen_ids}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+# Pause animated wallpapers on covered outputs and resume them when uncovered
+def update_fullscreen_state(event=None, data=None):
+    covered = _fullscreen_monitors()
+    if covered is None:
+        return
+    with _state_lock:
+        changed = covered ^ covered_monitors
+        covered_monitors.clear()
+        covered_monitors.update(covered)
+        swaps = [(name, _effective_wallpaper(name, current_wallpapers[name]))
+                 for name in changed if name in current_wallpapers and _is_animated(current_wallpapers[name])]
+    for name, path in swaps:
+        # No transition: the output is either hidden or just being revealed
+        ok, output = _run(["swww", "img", "-o", name, path, "--transition-type", "none"])
+        state = "paused" if name in covered else "resumed"
+        print(f"Animated wallpaper {state} on {name}" if ok else f"swww img failed on {name}: {output}")
+
+# Follow fullscreen changes from Hyprland's event socket
+def start_fullscreen_watch():
+    _load_swww_state()
+    for event in FULLSCREEN_EVENTS:
+        hypr_events.subscribe(event, update_fullscreen_state)
+    hypr_events.start_listener()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+
+import hypr_ipc
+
+# Dispatches per batch request, so one huge session does not stall Hyprland
+CHUNK_SIZE = 64
+
+# Saved window state: {"taken_at", "windows": [...]} or None
+saved_layout = None
+_lock = threading.Lock()
+
+# Record each client's monitor, workspace, floating state, position and size.
+# Positions are stored relative to their monitor so they can be clamped later
+def capture(snapshot):
+    global saved_layout
+    monitors = {mon.id: mon for mon in snapshot.monitors}
+    windows = []
+    for client in snapshot.clients:
+        mon = monitors.get(client.get("monitor"))
+        if mon is None or not client.get("address"):
+            continue
+        (x, y), (width, height) = client.get("at") or (0, 0), client.get("size") or (0, 0)
+        windows.append({
+            "address": client["address"],
+            "monitor": mon.identity,
+            "workspace": (client.get("workspace") or {}).get("name"),
+            "floating": bool(client.get("floating")),
+            "rel": (x - mon.x, y - mon.y),
+            "size": (width, height),
+        })
+    with _lock:
+        saved_layout = {"taken_at": snapshot.taken_at, "windows": windows}
+    print(f"Saved geometry of {len(windows)} windows")
+    return len(windows)
+
+# Place a saved window inside a monitor's logical rectangle
+def clamp_geometry(window, mon):
+    mon_width, mon_height = mon.logical_size
+    width = max(1, min(window["size"][0], mon_width))
+    height = max(1, min(window["size"][1], mon_height))
+    x = mon.x + min(max(window["rel"][0], 0), mon_width - width)
+    y = mon.y + min(max(window["rel"][1], 0), mon_height - height)
+    return x, y, width, height
+
+# Dispatches that put one saved window back
+def window_commands(window, mon):
+    address = f"address:{window['address']}"
+    commands = []
+    if window["workspace"] and not window["workspace"].startswith("special"):
+        commands.append(f"dispatch movetoworkspacesilent "
+                        f"{hypr_ipc.workspace_selector(window['workspace'])},{address}")
+    if window["floating"]:
+        x, y, width, height = clamp_geometry(window, mon)
+        commands.append(f"dispatch setfloating {address}")
+        commands.append(f"dispatch resizewindowpixel exact {width} {height},{address}")
+        commands.append(f"dispatch movewindowpixel exact {x} {y},{address}")
+    else:
+        commands.append(f"dispatch settiled {address}")
+    return commands
+
+# Put saved windows back on the new layout in chunked batches.
+# Returns the number of windows restored
+def restore(snapshot):
+    with _lock:
+        layout = saved_layout
+    if not layout:
+        return 0
+    start = time.perf_counter()
+    by_identity = {mon.identity: mon for mon in snapshot.monitors if not mon.disabled}
+    fallback = next((m for m in snapshot.monitors if m.primary and not m.disabled), None)
+    alive = {client.get("address") for client in snapshot.clients}
+
+    commands = []
+    restored = 0
+    for window in layout["windows"]:
+        if window["address"] not in alive:
+            continue
+        mon = by_identity.get(window["monitor"], fallback)
+        if mon is None:
+            continue
+        commands.extend(window_commands(window, mon))
+        restored += 1
+
+    failures = 0
+    for i in range(0, len(commands), CHUNK_SIZE):
+        replies = hypr_ipc.batch(commands[i:i + CHUNK_SIZE])
+        failures += sum(1 for reply in replies if reply != "ok")
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Restored {restored} windows with {len(commands)} dispatches in {elapsed:.0f} ms"
+          + (f", {failures} failed" if failures else ""))
+    return restored
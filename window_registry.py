@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import threading
+
+import hypr_events
+import hypr_model
+
+WINDOW_EVENTS = ("openwindow", "closewindow", "movewindow", "movewindowv2")
+WORKSPACE_EVENTS = ("moveworkspace", "moveworkspacev2", "focusedmon", "destroyworkspace")
+
+# address -> {"address", "workspace", "class", "title"}
+windows = {}
+# workspace name -> set of window addresses
+by_workspace = {}
+# workspace name -> monitor name, and monitor name -> set of workspace names
+workspace_monitor = {}
+monitor_workspaces = {}
+focused_monitor = None
+ready = False
+
+_lock = threading.RLock()
+_started = False
+
+# Events write addresses without the 0x prefix that hyprctl -j uses
+def _address(raw):
+    return raw if raw.startswith("0x") else f"0x{raw}"
+
+def _place_workspace(workspace, monitor):
+    old = workspace_monitor.get(workspace)
+    if old == monitor:
+        return
+    if old is not None:
+        monitor_workspaces.get(old, set()).discard(workspace)
+    workspace_monitor[workspace] = monitor
+    monitor_workspaces.setdefault(monitor, set()).add(workspace)
+
+def _place_window(address, workspace):
+    window = windows.get(address)
+    if window is None:
+        return
+    old = window["workspace"]
+    if old in by_workspace:
+        by_workspace[old].discard(address)
+    window["workspace"] = workspace
+    by_workspace.setdefault(workspace, set()).add(address)
+    # New workspaces open on the focused monitor
+    if workspace not in workspace_monitor and focused_monitor:
+        _place_workspace(workspace, focused_monitor)
+
+def _add_window(address, workspace, window_class="", title=""):
+    windows[address] = {"address": address, "workspace": None, "class": window_class, "title": title}
+    _place_window(address, workspace)
+
+# Rebuild all indexes from one snapshot
+def seed(snapshot=None):
+    global focused_monitor, ready
+    snapshot = snapshot or hypr_model.take_snapshot()
+    with _lock:
+        windows.clear()
+        by_workspace.clear()
+        workspace_monitor.clear()
+        monitor_workspaces.clear()
+        focused_monitor = next((m.name for m in snapshot.monitors if m.focused), None)
+        for ws in snapshot.workspaces:
+            _place_workspace(ws["name"], ws["monitor"])
+        for client in snapshot.clients:
+            workspace = (client.get("workspace") or {}).get("name")
+            _add_window(client["address"], workspace, client.get("class") or "", client.get("title") or "")
+        ready = True
+    print(f"Window registry: {len(windows)} windows on {len(monitor_workspaces)} monitors")
+
+# Apply one socket2 event to the indexes
+def handle_event(event, data):
+    global focused_monitor
+    with _lock:
+        if event == "openwindow":
+            address, workspace, window_class, title = (data.split(",", 3) + ["", "", ""])[:4]
+            _add_window(_address(address), workspace, window_class, title)
+        elif event == "closewindow":
+            window = windows.pop(_address(data), None)
+            if window and window["workspace"] in by_workspace:
+                by_workspace[window["workspace"]].discard(window["address"])
+        elif event == "movewindow":
+            address, _, workspace = data.partition(",")
+            _place_window(_address(address), workspace)
+        elif event == "movewindowv2":
+            address, _, workspace = data.split(",", 2)
+            _place_window(_address(address), workspace)
+        elif event == "moveworkspace":
+            workspace, _, monitor = data.rpartition(",")
+            _place_workspace(workspace, monitor)
+        elif event == "moveworkspacev2":
+            workspace, _, monitor = data.partition(",")[2].rpartition(",")
+            _place_workspace(workspace, monitor)
+        elif event == "focusedmon":
+            monitor, _, workspace = data.partition(",")
+            focused_monitor = monitor
+            _place_workspace(workspace, monitor)
+        elif event == "destroyworkspace":
+            if not by_workspace.get(data):
+                by_workspace.pop(data, None)
+                monitor = workspace_monitor.pop(data, None)
+                if monitor:
+                    monitor_workspaces.get(monitor, set()).discard(data)
+
+# Resync after the event socket (re)connects, since events may have been missed
+def _on_connected(event, data):
+    try:
+        seed()
+    except (OSError, ValueError) as e:
+        print(f"Window registry seed failed: {str(e)}")
+
+# Seed once and follow window and workspace events
+def start():
+    global _started
+    if _started:
+        return
+    _started = True
+    for event in WINDOW_EVENTS + WORKSPACE_EVENTS:
+        hypr_events.subscribe(event, handle_event)
+    hypr_events.subscribe("connected", _on_connected)
+    hypr_events.start_listener()
+
+# Window records on any monitor except the given one
+def windows_not_on(monitor):
+    with _lock:
+        return [windows[a] for other, names in monitor_workspaces.items() if other != monitor
+                for ws in names for a in by_workspace.get(ws, ())]
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import threading
+import time
+
+import atomic_file
+import hypr_events
+import hypr_ipc
+import hypr_model
+
+STATE_FILE = os.path.expanduser("~/.config/hyprland_monitor_manager/workspace_placement.json")
+HOTPLUG_EVENTS = ("monitoradded", "monitoraddedv2", "monitorremoved")
+
+# workspace name -> identity of the monitor it belongs on
+claims = None
+# identity -> connector name of the monitors active at the last sync
+_present = None
+_lock = threading.Lock()
+
+def _load():
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f).get("workspaces", {})
+    except (OSError, json.JSONDecodeError, AttributeError):
+        return {}
+
+def _save():
+    atomic_file.write_json(STATE_FILE, {"workspaces": claims}, indent=1, sort_keys=True)
+
+# Identity -> connector for enabled monitors; identical panels without a
+# serial are told apart by connector
+def _active_identities(snapshot):
+    present = {}
+    for mon in snapshot.monitors:
+        if mon.disabled:
+            continue
+        identity = mon.identity
+        if identity in present:
+            identity = f"{identity} @{mon.name}"
+        present[identity] = mon.name
+    return present
+
+# Record where workspaces live and work out which ones to send back to
+# monitors that just became active. Monitors that are gone keep their
+# claims, so their workspaces are not reassigned to wherever they landed.
+# Returns [(workspace name, monitor name)] moves
+def sync(snapshot):
+    global claims, _present
+    with _lock:
+        if claims is None:
+            claims = _load()
+        present = _active_identities(snapshot)
+        identity_of = {name: identity for identity, name in present.items()}
+        returning = set(present) - set(_present) if _present is not None else set()
+
+        moves = []
+        changed = False
+        for ws in snapshot.workspaces:
+            name = ws["name"]
+            if name.startswith("special"):
+                continue
+            current = identity_of.get(ws.get("monitor"))
+            owner = claims.get(name)
+            if owner in returning and current != owner:
+                moves.append((name, present[owner]))
+            elif current and owner != current and (owner is None or owner in present):
+                claims[name] = current
+                changed = True
+
+        _present = present
+        if changed:
+            _save()
+        return moves
+
+# Sync with a snapshot and send any workspaces home in one batch
+def restore(snapshot):
+    moves = sync(snapshot)
+    if not moves:
+        return 0
+    replies = hypr_ipc.batch(f"dispatch moveworkspacetomonitor {hypr_ipc.workspace_selector(name)} {monitor}"
+                             for name, monitor in moves)
+    restored = sum(1 for reply in replies if reply == "ok")
+    print(f"Restored {restored} of {len(moves)} workspaces: {moves}")
+    return restored
+
+def _on_hotplug(event, data):
+    # Give Hyprland a moment to place workspaces on the new output
+    time.sleep(0.5)
+    try:
+        restore(hypr_model.take_snapshot())
+    except (OSError, ValueError) as e:
+        print(f"Workspace restore failed: {str(e)}")
+
+# Also restore after physical hotplug, not only after the tool's own operations
+def start():
+    for event in HOTPLUG_EVENTS:
+        hypr_events.subscribe(event, _on_hotplug)
+    hypr_events.start_listener()